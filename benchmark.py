@@ -0,0 +1,311 @@
+# benchmark.py
+"""
+Material Selection hattı için ölçüm aracı.
+
+    python benchmark.py                                  # 10², 10⁴, 10⁶ kompozit
+    python benchmark.py --sizes 100 10000 --apptest 100 --output bench.json
+    python benchmark.py --sizes 10000 --compare bench.json
+
+Sentetik kompozitler sayfadaki `properties` şeması ve gömülü veri setinden türetilir
+(gerçekçi aralıklar, aynı N/A oranları). Her aşama için en iyi süre ve tepe bellek
+(tracemalloc) JSON olarak yazılır; --compare ile önceki bir çıktıyla oranlanır.
+"""
+import argparse
+import ast
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from filtering import PropertyIntervalIndex, rows_to_bitset, bitset_to_rows
+from imputation import IMPUTATION_METHODS, imputed_store
+from material_store import MaterialStore
+from pareto import MINIMIZED_BY_DEFAULT, pareto_fronts
+from prescreening import DEFAULT_RULES, evaluate_rules, pass_probabilities
+from scoring import (
+    condition_codes, score_matrix, weighted_scores, scenario_scores, top_k, sample_weights, rank_stability
+)
+from similarity import SimilarityIndex
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+PAGE_PATH = os.path.join(ROOT, "pages", "1_COMPADDITIVE_Material_Selection.py")
+
+# Ölçüm senaryosu: maliyet < 30 USD/kg, yoğunluk aralığı 1400 kg/m³'ü içeren, çekme dayanımı
+# > 100 MPa; ağırlıklar maliyet / yoğunluk / dayanım = 50 / 30 / 20
+FILTERS = {
+    "Cost (USD/kg)": ("smaller than", 30.0),
+    "Density (kg/m³)": ("equal to", 1400.0),
+    "Tensile Strength (MPa)": ("larger than", 100.0)
+}
+WEIGHTS = {"Cost (USD/kg)": 50, "Density (kg/m³)": 30, "Tensile Strength (MPa)": 20}
+PART_VOLUMES_M3 = np.array([2.5e-4, 1.2e-3, 8.0e-5, 4.4e-4, 6.1e-4, 3.3e-3, 9.0e-5, 1.7e-4])
+PART_QUANTITIES = np.array([1, 2, 4, 1, 1, 1, 8, 2], dtype=float)
+MAX_SENSITIVITY_ROWS = 100_000
+SCENARIOS = 20
+
+
+# ---------------------------
+# 🧬 Şema ve sentetik veri
+# ---------------------------
+def load_schema(page_path=PAGE_PATH):
+    """
+    Sayfayı çalıştırmadan (Streamlit olmadan) `properties` ve `embedded_datasets` değişmezlerini okur.
+    """
+    with open(page_path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    found = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id in ("properties", "embedded_datasets"):
+                found[node.targets[0].id] = ast.literal_eval(node.value)
+    return found["properties"], found["embedded_datasets"]
+
+
+def synthetic_composites(n, properties, datasets, seed=0):
+    """
+    Her sentetik kompozit rastgele bir gömülü kompoziti şablon alır: orta nokta ve aralık
+    genişliği log-normal gürültüyle oynatılır, N/A deseni şablondan gelir (oranlar korunur).
+    """
+    rng = np.random.default_rng(seed)
+    base = MaterialStore.from_dict(datasets, properties)
+    mids = (base.mins + base.maxs) / 2
+    halves = (base.maxs - base.mins) / 2
+
+    template = rng.integers(len(base), size=n)
+    mid = mids[template] * rng.lognormal(0.0, 0.15, size=(n, len(properties)))
+    half = halves[template] * rng.lognormal(0.0, 0.25, size=(n, len(properties)))
+    mins = np.maximum(mid - half, 0.0)
+    maxs = mid + half
+    names = [f"SYN-{i:07d}" for i in range(n)]
+    return names, mins, maxs
+
+
+# ---------------------------
+# ⏱️ Ölçüm
+# ---------------------------
+def measure(fn, repeat):
+    """
+    Süre: izleme olmadan `repeat` çalıştırmanın en iyisi. Tepe bellek: ayrı, tracemalloc'lu bir çalıştırma.
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak / 2**20
+
+
+def run_pipeline(n, properties, datasets, repeat, seed=0):
+    names, mins, maxs = synthetic_composites(n, properties, datasets, seed)
+    results = []
+
+    def record(stage, fn, **extra):
+        value, seconds, peak_mb = measure(fn, repeat)
+        results.append({"stage": stage, "n": n, "seconds": seconds, "peak_mb": peak_mb, **extra})
+        return value
+
+    def build_store():
+        store = MaterialStore(properties)
+        store.add_many(names, mins, maxs)
+        return store
+
+    store = record("store_build", build_store)
+
+    _, pass_matrix = record("prescreening", lambda: evaluate_rules(DEFAULT_RULES, store))
+    passed_rows = np.flatnonzero(pass_matrix.all(axis=1))
+    record(
+        "prescreening_probability",
+        lambda: pass_probabilities(DEFAULT_RULES, store, n_samples=100, seed=0),
+        n_samples=100
+    )
+
+    index = record("interval_index", lambda: PropertyIntervalIndex(store, list(FILTERS)))
+    filtered = record(
+        "filtering",
+        lambda: bitset_to_rows(index.filter(FILTERS, rows_to_bitset(passed_rows, len(store))), len(store)),
+        passed=len(passed_rows)
+    )
+
+    filter_props = list(FILTERS)
+    weights = [WEIGHTS[prop] for prop in filter_props]
+
+    def score():
+        lo, hi = store.ranges(filtered, store.columns(filter_props))
+        scores = score_matrix(lo, hi, condition_codes([c for c, _ in FILTERS.values()]), [v for _, v in FILTERS.values()])
+        totals = weighted_scores(scores, weights)
+        return scores, top_k(totals, 25)
+
+    scores, _ = record("scoring", score, filtered=len(filtered))
+
+    if len(filtered) <= MAX_SENSITIVITY_ROWS:
+        samples = sample_weights(weights, 200, seed=0)
+        record("sensitivity", lambda: rank_stability(scores, samples, weights), filtered=len(filtered), n_samples=200)
+    else:
+        results.append({"stage": "sensitivity", "n": n, "skipped": f"filtered pool > {MAX_SENSITIVITY_ROWS}"})
+
+    maximize = [prop not in MINIMIZED_BY_DEFAULT for prop in filter_props]
+    record(
+        "pareto",
+        lambda: pareto_fronts(store.midpoints(filtered)[:, store.columns(filter_props)], maximize, max_fronts=3),
+        filtered=len(filtered)
+    )
+
+    def mold_costs():
+        mid = store.midpoints(filtered)
+        cost = mid[:, store.prop_index["Cost (USD/kg)"]]
+        density = mid[:, store.prop_index["Density (kg/m³)"]]
+        mass = (PART_VOLUMES_M3 * PART_QUANTITIES)[:, None] * density[None, :]
+        return mass * cost[None, :]
+
+    # Senaryo karşılaştırması: aynı filtre seti, ağırlık simpleksinden örneklenen SCENARIOS ağırlık seti
+    def scenarios():
+        codes = np.tile(condition_codes([c for c, _ in FILTERS.values()]), (SCENARIOS, 1))
+        values = np.tile([v for _, v in FILTERS.values()], (SCENARIOS, 1))
+        scenario_weights = sample_weights(weights, SCENARIOS, mode="uniform", seed=0)
+        lo, hi = store.ranges(passed_rows, store.columns(filter_props))
+        return scenario_scores(lo, hi, codes, values, scenario_weights)
+
+    record("scenarios", scenarios, passed=len(passed_rows), scenarios=SCENARIOS)
+
+    record("mold_costs", mold_costs, filtered=len(filtered), parts=len(PART_VOLUMES_M3))
+
+    def table_order():
+        lo, _ = store.ranges(None, [store.prop_index["Cost (USD/kg)"]])
+        order = np.argsort(lo[:, 0], kind="stable")
+        return store.names_at(order[:25])
+
+    record("table_order", table_order)
+
+    for method in IMPUTATION_METHODS:
+        record(f"imputation_{method}", lambda: imputed_store(store, method), missing=int(store.missing.sum()))
+
+    similarity = record("similarity_index", lambda: SimilarityIndex(store, properties))
+    record("similarity_query", lambda: similarity.query(0, k=10), k=10)
+    return results
+
+
+# ---------------------------
+# 🖥️ Uçtan uca: AppTest ile başsız yeniden çalıştırma süreleri
+# ---------------------------
+def run_apptest(n, properties, datasets, seed=0):
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    import material_db
+
+    names, mins, maxs = synthetic_composites(n, properties, datasets, seed)
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        # Sayfa veritabanı yolunu her çalıştırmada material_db modülünden okur
+        original_path = material_db.MATERIAL_DB_PATH
+        material_db.MATERIAL_DB_PATH = os.path.join(workdir, "materials.db")
+        material_db.SharedMaterialDB(material_db.MATERIAL_DB_PATH, properties).add_many(names, mins, maxs)
+        st.cache_resource.clear()
+        try:
+            at = AppTest.from_file(PAGE_PATH, default_timeout=600)
+            at.session_state["authenticated"] = True
+
+            def timed(step, action):
+                start = time.perf_counter()
+                action()
+                if at.exception:
+                    raise RuntimeError(f"AppTest {step}: {at.exception}")
+                results.append({"stage": f"apptest_{step}", "n": n + len(datasets), "seconds": time.perf_counter() - start})
+
+            timed("cold_run", at.run)
+            timed("warm_rerun", at.run)
+            # Koşul / değer kutuları onay kutusundan sonraki çalıştırmada oluşur
+            for prop in FILTERS:
+                at.checkbox(key=f"chk_{prop}").check()
+            timed("checkbox_rerun", at.run)
+            for prop, (condition, value) in FILTERS.items():
+                at.selectbox(key=f"cond_{prop}").select(condition)
+                at.number_input(key=f"val_{prop}").set_value(value)
+            timed("filters_rerun", at.run)
+            for prop, weight in WEIGHTS.items():
+                at.number_input(key=f"weight_{prop}").set_value(weight)
+            timed("weights_rerun", at.run)
+            at.number_input(key="weight_Cost (USD/kg)").set_value(40)
+            at.number_input(key="weight_Density (kg/m³)").set_value(40)
+            timed("weight_change_rerun", at.run)
+        finally:
+            material_db.MATERIAL_DB_PATH = original_path
+            st.cache_resource.clear()
+    return results
+
+
+# ---------------------------
+# 📄 Çıktı ve karşılaştırma
+# ---------------------------
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+
+
+def compare(previous, current):
+    before = {(r["stage"], r["n"]): r for r in previous["results"] if "seconds" in r}
+    print(f"{'stage':<28}{'n':>10}{'before (s)':>14}{'after (s)':>12}{'ratio':>8}")
+    for r in current["results"]:
+        old = before.get((r["stage"], r["n"]))
+        if old is None or "seconds" not in r:
+            continue
+        ratio = r["seconds"] / old["seconds"] if old["seconds"] else float("inf")
+        print(f"{r['stage']:<28}{r['n']:>10}{old['seconds']:>14.4f}{r['seconds']:>12.4f}{ratio:>8.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Material Selection pipeline benchmark")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[100, 10_000, 1_000_000])
+    parser.add_argument("--apptest", type=int, nargs="*", default=[], help="sizes for end-to-end AppTest runs")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="JSON output path (default: stdout)")
+    parser.add_argument("--compare", help="previous JSON output to compare against")
+    args = parser.parse_args(argv)
+
+    properties, datasets = load_schema()
+    results = []
+    for n in args.sizes:
+        print(f"pipeline n={n}...", file=sys.stderr)
+        results.extend(run_pipeline(n, properties, datasets, args.repeat if n < 1_000_000 else 1, args.seed))
+    for n in args.apptest:
+        print(f"apptest n={n}...", file=sys.stderr)
+        results.extend(run_apptest(n, properties, datasets, args.seed))
+
+    report = {"meta": metadata(), "results": results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
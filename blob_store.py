@@ -0,0 +1,108 @@
+# blob_store.py
+import hashlib
+import os
+import sqlite3
+import tempfile
+from contextlib import closing, contextmanager
+
+COPY_BLOCK = 1 << 20
+
+
+# ---------------------------
+# 🧱 İçerik adresli dosya deposu (SHA-256) + referans sayımı
+# ---------------------------
+class BlobStore:
+    """
+    Dosyalar içeriklerinin SHA-256 özetiyle saklanır: <root>/ab/abcdef... Aynı içerik
+    kaç kez, hangi projeden yüklenirse yüklensin diskte bir kez bulunur; isim çakışması olmaz.
+    Her özetin kaç kayıt tarafından kullanıldığı <root>/refs.db içinde tutulur; sayaç
+    sıfıra inince dosya (ve on_release ile bağlı türevleri) silinir.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS refs (digest TEXT PRIMARY KEY, count INTEGER NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(os.path.join(self.root, "refs.db"), timeout=30)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        refs.db üzerinde yazma kilidi (BEGIN IMMEDIATE): sayaç ve dosyanın varlığı aynı kilit
+        altında değişir, başka süreçteki release araya giremez.
+        """
+        conn = sqlite3.connect(os.path.join(self.root, "refs.db"), timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def path(self, digest):
+        return os.path.join(self.root, digest[:2], digest)
+
+    def refcount(self, digest):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT count FROM refs WHERE digest = ?", (digest,)).fetchone()
+        return row[0] if row else 0
+
+    def put(self, stream):
+        """
+        Akışı geçici dosyaya yazarken özetini hesaplar; sonra tek işlemde bir referans ekler ve
+        içerik yoksa geçici dosyayı içerik adresine taşır (varsa geçici dosya silinir).
+        Referans kullanılmayacaksa (ör. yinelenen kayıt) release ile geri verilir.
+        Geri dönüş: (özet, bayt sayısı, içerik zaten var mıydı)
+        """
+        digest = hashlib.sha256()
+        size = 0
+        fd, temporary = tempfile.mkstemp(dir=self.root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                for block in iter(lambda: stream.read(COPY_BLOCK), b""):
+                    digest.update(block)
+                    out.write(block)
+                    size += len(block)
+            digest = digest.hexdigest()
+            target = self.path(digest)
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT INTO refs (digest, count) VALUES (?, 1) ON CONFLICT(digest) DO UPDATE SET count = count + 1",
+                    (digest,)
+                )
+                existed = os.path.exists(target)
+                if not existed:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    os.replace(temporary, target)
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+        return digest, size, existed
+
+    def put_file(self, path):
+        with open(path, "rb") as f:
+            return self.put(f)
+
+    def release(self, digest, on_release=None):
+        """
+        Bir referansı düşürür; son referanssa dosya silinir ve on_release(özet) çağrılır.
+        Silme ve on_release put ile aynı kilit altındadır: araya yeni bir yükleme giremez.
+        """
+        with self._transaction() as conn:
+            conn.execute("UPDATE refs SET count = count - 1 WHERE digest = ?", (digest,))
+            row = conn.execute("SELECT count FROM refs WHERE digest = ?", (digest,)).fetchone()
+            last = row is None or row[0] <= 0
+            if last:
+                conn.execute("DELETE FROM refs WHERE digest = ?", (digest,))
+                if os.path.exists(self.path(digest)):
+                    os.remove(self.path(digest))
+                if on_release is not None:
+                    on_release(digest)
+        return last
@@ -0,0 +1,136 @@
+# filtering.py
+import numpy as np
+
+LEAF_SIZE = 64
+
+
+# ---------------------------
+# 🧮 Bitset yardımcıları (np.packbits ile 8 satır / bayt)
+# ---------------------------
+def rows_to_bitset(rows, n):
+    mask = np.zeros(n, dtype=bool)
+    mask[rows] = True
+    return np.packbits(mask)
+
+
+def full_bitset(n):
+    return np.packbits(np.ones(n, dtype=bool))
+
+
+def bitset_to_rows(bits, n):
+    return np.flatnonzero(np.unpackbits(bits, count=n))
+
+
+# ---------------------------
+# 🌳 Statik merkezli aralık ağacı ("equal to" için stabbing sorgusu)
+# ---------------------------
+class IntervalTree:
+    """
+    Düğüm başına merkez noktasını kesen aralıklar min'e göre artan ve max'a göre
+    azalan sırada tutulur; sorgu kökten yaprağa tek yol izler ve her düğümde
+    ikili arama ile yalnızca isabetleri toplar → O(log n + isabet).
+    """
+
+    def __init__(self, mins, maxs, rows):
+        self.nodes = []
+        self.root = self._build(np.asarray(mins, float), np.asarray(maxs, float), np.asarray(rows, np.intp))
+
+    def _build(self, mins, maxs, rows):
+        if not len(rows):
+            return -1
+        if len(rows) <= LEAF_SIZE:
+            self.nodes.append(("leaf", mins, maxs, rows))
+            return len(self.nodes) - 1
+
+        center = float(np.median((mins + maxs) / 2))
+        left = maxs < center
+        right = mins > center
+        here = ~(left | right)
+
+        by_min = np.argsort(mins[here], kind="stable")
+        by_max = np.argsort(-maxs[here], kind="stable")
+        node = [
+            "node", center,
+            mins[here][by_min], rows[here][by_min],
+            -maxs[here][by_max], rows[here][by_max],
+            -1, -1
+        ]
+        self.nodes.append(node)
+        index = len(self.nodes) - 1
+        node[6] = self._build(mins[left], maxs[left], rows[left])
+        node[7] = self._build(mins[right], maxs[right], rows[right])
+        return index
+
+    def stab(self, value):
+        hits = []
+        index = self.root
+        while index != -1:
+            node = self.nodes[index]
+            if node[0] == "leaf":
+                _, mins, maxs, rows = node
+                hits.append(rows[(mins <= value) & (value <= maxs)])
+                break
+            _, center, sorted_mins, min_rows, neg_maxs, max_rows, left, right = node
+            if value < center:
+                # Merkezden küçük: max ≥ center > value, yalnızca min ≤ value kontrolü
+                hits.append(min_rows[:np.searchsorted(sorted_mins, value, side="right")])
+                index = left
+            elif value > center:
+                # Merkezden büyük: min ≤ center < value, yalnızca max ≥ value kontrolü
+                hits.append(max_rows[:np.searchsorted(neg_maxs, -value, side="right")])
+                index = right
+            else:
+                hits.append(min_rows)
+                break
+        if not hits:
+            return np.empty(0, dtype=np.intp)
+        return np.concatenate(hits)
+
+
+# ---------------------------
+# 🔎 Özellik bazlı aralık indeksi
+# ---------------------------
+class PropertyIntervalIndex:
+    """
+    Her özellik için (eksik olmayan satırlar):
+    - min'e göre sıralı dizi → "smaller than" (min ≤ değer)
+    - max'a göre sıralı dizi → "larger than" (max ≥ değer)
+    - aralık ağacı → "equal to" (min ≤ değer ≤ max)
+    Her filtre ikili arama ile bir aday bitset'ine çözülür.
+    """
+
+    def __init__(self, store, props):
+        self.n = len(store)
+        self.version = store.version
+        self.by_prop = {}
+        for prop in props:
+            mins, maxs, missing = store.column(prop)
+            rows = np.flatnonzero(~missing)
+            min_order = rows[np.argsort(mins[rows], kind="stable")]
+            max_order = rows[np.argsort(maxs[rows], kind="stable")]
+            self.by_prop[prop] = {
+                "sorted_mins": mins[min_order],
+                "min_rows": min_order,
+                "sorted_maxs": maxs[max_order],
+                "max_rows": max_order,
+                "tree": IntervalTree(mins[rows], maxs[rows], rows)
+            }
+
+    def query(self, prop, condition, value):
+        entry = self.by_prop[prop]
+        if condition == "smaller than":
+            return entry["min_rows"][:np.searchsorted(entry["sorted_mins"], value, side="right")]
+        if condition == "larger than":
+            return entry["max_rows"][np.searchsorted(entry["sorted_maxs"], value, side="left"):]
+        if condition == "equal to":
+            return entry["tree"].stab(value)
+        return np.empty(0, dtype=np.intp)
+
+    def filter(self, filters, base_bits=None):
+        """
+        filters: {özellik: (koşul, değer)} → tüm filtrelerin bitset kesişimi
+        """
+        bits = full_bitset(self.n) if base_bits is None else base_bits.copy()
+        for prop, (condition, value) in filters.items():
+            bits &= rows_to_bitset(self.query(prop, condition, value), self.n)
+        return bits
@@ -0,0 +1,111 @@
+# imputation.py
+import warnings
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from material_store import MaterialStore
+
+IMPUTATION_METHODS = ("knn", "regression")
+# Her özellik, kendisiyle en güçlü ilişkili bu kadar özellikten tahmin edilir (KD-ağacı düşük boyutta kalır)
+IMPUTATION_PREDICTORS = 4
+
+
+# ---------------------------
+# 🧩 Eksik aralıkların doldurulması (özellik başına vektörel)
+# ---------------------------
+def _standardized_midpoints(mins, maxs):
+    """
+    Orta noktalar medyan / çeyrekler arası açıklık ile ölçeklenir; eksik hücreler 0 (medyan) olur.
+    """
+    mid = (mins + maxs) / 2
+    missing = np.isnan(mid)
+    # Tamamen boş kolonlar için nanmedian uyarısı bastırılır (merkez 0, ölçek 1 olur)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        center = np.nan_to_num(np.nanmedian(mid, axis=0))
+        q75, q25 = np.nanpercentile(mid, [75, 25], axis=0)
+        fallback = np.nanstd(mid, axis=0)
+    scale = q75 - q25
+    scale = np.where(scale > 0, scale, np.where(fallback > 0, fallback, 1.0))
+    z = (mid - center) / scale
+    z[missing] = 0.0
+    return z
+
+
+def impute_ranges(mins, maxs, method="knn", k=5):
+    """
+    Eksik min / max değerlerini tüm matris üzerinde, özellik başına tek geçişte doldurur.
+    Tahminde her özellik için en ilişkili IMPUTATION_PREDICTORS özellik kullanılır.
+    - "knn": bu özelliklerin ölçeklenmiş orta noktalarında en yakın k bağışçının
+      (özelliği dolu satırlar) min / max değerlerinin uzaklık ağırlıklı ortalaması
+    - "regression": bu özelliklerden orta nokta ve yarı genişliğe en küçük kareler
+      doğrusal modeli; tahmin bağışçıların değer aralığıyla sınırlanır
+    Hiç dolu değeri olmayan özellikler NaN kalır.
+    Geri dönüş: (mins, maxs, imputed) — imputed, doldurulan hücreler için bool maske.
+    """
+    if method not in IMPUTATION_METHODS:
+        raise ValueError(f"Unknown imputation method: {method}")
+    mins = np.asarray(mins, dtype=float)
+    maxs = np.asarray(maxs, dtype=float)
+    missing = np.isnan(mins) | np.isnan(maxs)
+    filled_mins, filled_maxs = mins.copy(), maxs.copy()
+    n_props = mins.shape[1]
+    if not missing.any() or n_props < 2:
+        return filled_mins, filled_maxs, np.zeros_like(missing)
+
+    z = _standardized_midpoints(mins, maxs)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.nan_to_num(np.abs(np.corrcoef(z, rowvar=False)))
+    np.fill_diagonal(correlation, -1.0)
+    for j in range(n_props):
+        targets = np.flatnonzero(missing[:, j])
+        donors = np.flatnonzero(~missing[:, j])
+        if not len(targets) or not len(donors):
+            continue
+        predictors = np.argsort(-correlation[j], kind="stable")[:min(IMPUTATION_PREDICTORS, n_props - 1)]
+        features = z[:, predictors]
+
+        if method == "knn":
+            n_neighbours = min(k, len(donors))
+            distances, idx = cKDTree(features[donors]).query(features[targets], k=n_neighbours, workers=-1)
+            distances = distances.reshape(len(targets), n_neighbours)
+            neighbours = donors[idx.reshape(len(targets), n_neighbours)]
+            w = 1.0 / (distances + 1e-9)
+            w /= w.sum(axis=1, keepdims=True)
+            low = (mins[neighbours, j] * w).sum(axis=1)
+            high = (maxs[neighbours, j] * w).sum(axis=1)
+        else:
+            design = np.column_stack([np.ones(len(z)), features])
+            mid = (mins[donors, j] + maxs[donors, j]) / 2
+            half = (maxs[donors, j] - mins[donors, j]) / 2
+            coef, *_ = np.linalg.lstsq(design[donors], np.column_stack([mid, half]), rcond=None)
+            predicted = design[targets] @ coef
+            pred_mid = np.clip(predicted[:, 0], mins[donors, j].min(), maxs[donors, j].max())
+            pred_half = np.clip(predicted[:, 1], 0.0, half.max())
+            low, high = pred_mid - pred_half, pred_mid + pred_half
+            if mins[donors, j].min() >= 0:
+                low = np.maximum(low, 0.0)
+
+        # Yalnızca eksik sınırlar doldurulur; tek sınırı dolu hücrelerde mevcut değer korunur
+        row_mins, row_maxs = filled_mins[targets, j], filled_maxs[targets, j]
+        row_mins = np.where(np.isnan(row_mins), low, row_mins)
+        row_maxs = np.where(np.isnan(row_maxs), high, row_maxs)
+        filled_mins[targets, j] = np.minimum(row_mins, row_maxs)
+        filled_maxs[targets, j] = np.maximum(row_mins, row_maxs)
+
+    imputed = missing & ~(np.isnan(filled_mins) | np.isnan(filled_maxs))
+    return filled_mins, filled_maxs, imputed
+
+
+def imputed_store(store, method="knn", k=5):
+    """
+    Deponun doldurulmuş, salt okunur bir kopyası. Satır indeksleri ve isimler aynıdır;
+    doldurulan hücreler `imputed` maskesinde işaretlidir. Sürüm, kaynak sürüm + yöntemdir.
+    """
+    mins, maxs = store.ranges()
+    filled_mins, filled_maxs, imputed = impute_ranges(mins, maxs, method, k)
+    view = MaterialStore(store.properties, store.names_at(np.arange(len(store))), filled_mins, filled_maxs)
+    view.version = f"{store.version}+{method}{k if method == 'knn' else ''}"
+    view.imputed = imputed
+    return view
@@ -0,0 +1,97 @@
+# literature_preview.py
+import io
+import os
+import zipfile
+
+from PIL import Image
+
+# Önizleme boyutları (uzun kenar, piksel)
+PREVIEW_SIZES = {"thumb": 96, "preview": 1200}
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+OFFICE_EXTENSIONS = (".docx", ".pptx", ".xlsx")
+
+
+# ---------------------------
+# 🖼️ Kaynak görüntü: resim, PDF ilk sayfası veya ofis belgesinin gömülü küçük resmi
+# ---------------------------
+def _image_source(path):
+    image = Image.open(path)
+    # JPEG'ler hedef boyuta yakın ölçekte çözülür (tam çözünürlük açılmaz)
+    image.draft("RGB", (PREVIEW_SIZES["preview"], PREVIEW_SIZES["preview"]))
+    return image
+
+
+def _pdf_source(path):
+    try:
+        import pymupdf
+    except ImportError:
+        return None
+    with pymupdf.open(path) as doc:
+        if not doc.page_count:
+            return None
+        page = doc[0]
+        zoom = PREVIEW_SIZES["preview"] / max(page.rect.width, page.rect.height, 1)
+        pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+        return Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+
+def _office_source(path):
+    # Word / PowerPoint / Excel kaydederken docProps/thumbnail.* ekleyebilir; yoksa önizleme yok
+    with zipfile.ZipFile(path) as archive:
+        for name in archive.namelist():
+            if name.lower().startswith("docprops/thumbnail."):
+                image = Image.open(io.BytesIO(archive.read(name)))
+                image.load()
+                return image
+    return None
+
+
+def _source_image(path, extension):
+    if extension in IMAGE_EXTENSIONS:
+        return _image_source(path)
+    if extension == ".pdf":
+        return _pdf_source(path)
+    if extension in OFFICE_EXTENSIONS:
+        return _office_source(path)
+    return None
+
+
+# ---------------------------
+# 🗂️ İçerik özetine göre disk önbelleği
+# ---------------------------
+def preview_path(cache_dir, digest, size):
+    return os.path.join(cache_dir, f"{digest}_{size}.jpg")
+
+
+def cached_preview(cache_dir, digest, size):
+    """
+    Önbellekte varsa önizleme dosyasının yolu, yoksa None (dosya açılmaz).
+    """
+    path = preview_path(cache_dir, digest, size)
+    return path if os.path.exists(path) else None
+
+
+def build_previews(path, filename, digest, cache_dir):
+    """
+    Küçük resim ve önizlemeyi bir kez üretip önbelleğe yazar; aynı içerik için tekrar çalışmaz.
+    Önizleme üretilemeyen dosya türlerinde hiçbir şey yazılmaz.
+    """
+    if all(cached_preview(cache_dir, digest, size) for size in PREVIEW_SIZES):
+        return True
+    try:
+        image = _source_image(path, os.path.splitext(filename)[1].lower())
+    except Exception:
+        image = None
+    if image is None:
+        return False
+
+    os.makedirs(cache_dir, exist_ok=True)
+    image = image.convert("RGB")
+    for size, pixels in sorted(PREVIEW_SIZES.items(), key=lambda item: -item[1]):
+        image.thumbnail((pixels, pixels), Image.LANCZOS)
+        target = preview_path(cache_dir, digest, size)
+        # Yarım yazılmış dosya okunmasın: geçici dosyaya yazılıp yer değiştirilir
+        temporary = f"{target}.{os.getpid()}.tmp"
+        image.save(temporary, "JPEG", quality=85, optimize=True)
+        os.replace(temporary, target)
+    return True
@@ -0,0 +1,187 @@
+# literature_search.py
+import csv
+import io
+import math
+import os
+import re
+import sqlite3
+import threading
+import zipfile
+from collections import Counter
+from contextlib import closing
+from html import unescape
+
+TOKEN_RE = re.compile(r"[^\W_]{2,}")
+STOPWORDS = frozenset(
+    "the and for with that this from are was were been has have had not but its into than then "
+    "also which their there these those such can may our via per using used use between over".split()
+)
+# Ofis belgelerinde metin taşıyan XML öğeleri (Word: w:t, PowerPoint: a:t)
+OFFICE_TEXT_RE = re.compile(rb"<(?:w|a):t(?:\s[^>]*)?>([^<]*)</(?:w|a):t>")
+OFFICE_PARAGRAPH_RE = re.compile(rb"</(?:w|a):p>")
+MARKDOWN_SPECIAL_RE = re.compile(r"([\\`*_\[\]#<>|~$])")
+MAX_INDEXED_CHARS = 2_000_000
+SNIPPET_CHARS = 240
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+# ---------------------------
+# 📄 Metin çıkarma (yükleme anında bir kez)
+# ---------------------------
+def _office_text(path, prefix):
+    parts = []
+    with zipfile.ZipFile(path) as archive:
+        names = sorted(
+            (n for n in archive.namelist() if n.startswith(prefix) and n.endswith(".xml")),
+            key=lambda n: [int(x) if x.isdigit() else x for x in re.split(r"(\d+)", n)]
+        )
+        for name in names:
+            xml = OFFICE_PARAGRAPH_RE.sub(b"\n", archive.read(name))
+            parts.append(b" ".join(OFFICE_TEXT_RE.findall(xml)).decode("utf-8", "replace"))
+    return unescape("\n".join(parts))
+
+
+def _pdf_text(path):
+    try:
+        import pymupdf
+    except ImportError:
+        return ""
+    with pymupdf.open(path) as doc:
+        return "\n".join(page.get_text() for page in doc)
+
+
+def _sheet_text(path):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        return "\n".join(
+            " ".join(str(cell) for cell in row if cell is not None)
+            for sheet in workbook.worksheets
+            for row in sheet.iter_rows(values_only=True)
+        )
+    finally:
+        workbook.close()
+
+
+def _csv_text(path):
+    with open(path, "r", encoding="utf-8", errors="replace", newline="") as f:
+        return "\n".join(" ".join(row) for row in csv.reader(io.StringIO(f.read(MAX_INDEXED_CHARS))))
+
+
+def extract_text(path, filename=None):
+    """
+    PDF, DOCX, PPTX, XLSX ve CSV dosyalarından düz metin. Desteklenmeyen veya okunamayan
+    dosyalar için boş metin döner (dosya yine listelenir, yalnızca aranamaz).
+    """
+    extension = os.path.splitext(filename or path)[1].lower()
+    try:
+        if extension == ".pdf":
+            text = _pdf_text(path)
+        elif extension == ".docx":
+            text = _office_text(path, "word/document")
+        elif extension == ".pptx":
+            text = _office_text(path, "ppt/slides/slide")
+        elif extension == ".xlsx":
+            text = _sheet_text(path)
+        elif extension == ".csv":
+            text = _csv_text(path)
+        else:
+            text = ""
+    except Exception:
+        text = ""
+    return text[:MAX_INDEXED_CHARS]
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+# ---------------------------
+# 🔎 Kalıcı ters indeks (SQLite) + BM25 sıralama
+# ---------------------------
+class SearchIndex:
+    """
+    Belge başına terim frekansları `postings (term, doc, tf)` tablosunda, terime göre
+    kümelenmiş (WITHOUT ROWID) tutulur; belge uzunlukları ve metin `docs` tablosunda.
+    Ekleme / silme yalnızca o belgenin satırlarına dokunur, yeniden kurma gerekmez.
+    Sorgu: terimlerin posting listeleri tek SELECT ile okunur, BM25 puanı bellekte toplanır.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS docs (doc TEXT PRIMARY KEY, length INTEGER, text TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS postings (term TEXT, doc TEXT, tf INTEGER, PRIMARY KEY (term, doc)) WITHOUT ROWID"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def documents(self):
+        with closing(self._connect()) as conn:
+            return {doc for (doc,) in conn.execute("SELECT doc FROM docs")}
+
+    def add(self, doc, text):
+        counts = Counter(tokenize(text))
+        with self.lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM postings WHERE doc = ?", (doc,))
+            conn.execute(
+                "INSERT OR REPLACE INTO docs (doc, length, text) VALUES (?, ?, ?)",
+                (doc, sum(counts.values()), text)
+            )
+            conn.executemany(
+                "INSERT INTO postings (term, doc, tf) VALUES (?, ?, ?)",
+                ((term, doc, tf) for term, tf in counts.items())
+            )
+
+    def remove(self, doc):
+        with self.lock, closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM postings WHERE doc = ?", (doc,))
+            conn.execute("DELETE FROM docs WHERE doc = ?", (doc,))
+
+    def search(self, query, limit=20):
+        """
+        BM25 ile sıralanmış [(belge, puan, alıntı)] — en fazla limit sonuç.
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+        marks = ",".join("?" * len(terms))
+        with closing(self._connect()) as conn:
+            n_docs, total_length = conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM docs").fetchone()
+            postings = conn.execute(
+                f"SELECT p.term, p.doc, p.tf, d.length FROM postings p JOIN docs d ON d.doc = p.doc WHERE p.term IN ({marks})",
+                terms
+            ).fetchall()
+            if not postings:
+                return []
+
+            avg_length = total_length / max(n_docs, 1) or 1.0
+            df = Counter(term for term, _, _, _ in postings)
+            scores = Counter()
+            for term, doc, tf, length in postings:
+                idf = math.log(1 + (n_docs - df[term] + 0.5) / (df[term] + 0.5))
+                scores[doc] += idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length))
+
+            hits = scores.most_common(limit)
+            texts = dict(conn.execute(
+                f"SELECT doc, text FROM docs WHERE doc IN ({','.join('?' * len(hits))})", [doc for doc, _ in hits]
+            ).fetchall())
+        return [(doc, score, snippet(texts.get(doc, ""), terms)) for doc, score in hits]
+
+
+def snippet(text, terms, width=SNIPPET_CHARS):
+    """
+    İlk eşleşmenin çevresinden kısa bir alıntı; eşleşen kelimeler kalın yazılır.
+    """
+    pattern = re.compile(r"\b(" + "|".join(re.escape(term) for term in terms) + r")\b", re.IGNORECASE)
+    match = pattern.search(text)
+    start = max(0, match.start() - width // 3) if match else 0
+    excerpt = MARKDOWN_SPECIAL_RE.sub(r"\\\1", " ".join(text[start:start + width].split()))
+    excerpt = pattern.sub(lambda m: f"**{m.group(0)}**", excerpt)
+    return ("…" if start else "") + excerpt + ("…" if start + width < len(text) else "")
@@ -0,0 +1,278 @@
+# literature_store.py
+import os
+import uuid
+from datetime import datetime
+
+import streamlit as st
+
+from blob_store import BlobStore
+from literature_preview import PREVIEW_SIZES, build_previews, cached_preview, preview_path
+from literature_search import SearchIndex, extract_text
+from metadata_log import MetadataLog
+
+# COMPADDITIVE ve CREDIT sayfalarının ortak içerik adresli dosya deposu
+LITERATURE_BLOB_DIR = "uploaded_literature_blobs"
+ACCEPTED_TYPES = ["pdf", "jpg", "jpeg", "png", "xlsx", "xls", "csv", "docx", "pptx"]
+
+
+# ---------------------------
+# 📚 Literatür kayıtları: metadata günlüğü + içerik adresli dosyalar
+# ---------------------------
+class LiteratureStore:
+    """
+    Bir projenin literatür kayıt listesi (metadata_file anlık görüntüsü + işlem günlüğü, bkz.
+    MetadataLog). Dosyalar projeler arasında paylaşılan içerik adresli depoda (blob_dir, SHA-256)
+    tutulur; kayıtlar özete işaret eder, aynı dosya iki projeye yüklense de diskte bir kez bulunur.
+    COMPADDITIVE ve CREDIT sayfaları aynı sınıfı kendi metadata dosyalarıyla kullanır; upload_dir
+    yalnızca eski (isimle saklanmış) dosyalar içindir.
+    Dosya içerikleri yalnızca indirme istendiğinde okunur. Metin yüklemede bir kez çıkarılıp tam
+    metin indeksine (metadata dosyasının yanında, *_index.db) eklenir; küçük resim / önizleme de
+    yüklemede bir kez üretilir ve özetle saklanır.
+    """
+
+    def __init__(self, upload_dir, metadata_file, blob_dir=LITERATURE_BLOB_DIR):
+        self.upload_dir = upload_dir
+        self.metadata_file = metadata_file
+        self.log = MetadataLog(metadata_file)
+        self.blobs = BlobStore(blob_dir)
+        self.index = SearchIndex(f"{os.path.splitext(metadata_file)[0]}_index.db")
+        self.preview_dir = os.path.join(blob_dir, "previews")
+
+    @property
+    def entries(self):
+        return self.log.entries()
+
+    def path(self, entry):
+        # Dosyası taşınamamış (diskte bulunamayan) eski kayıtlar eski yolu gösterir
+        if "sha256" not in entry:
+            return os.path.join(self.upload_dir, entry["filename"])
+        return self.blobs.path(entry["sha256"])
+
+    def entry(self, entry_id):
+        return self.log.get(entry_id)
+
+    def duplicates(self, digest):
+        return [entry for entry in self.entries if entry.get("sha256") == digest]
+
+    def _index_entry(self, entry):
+        text = extract_text(self.path(entry), entry["filename"])
+        self.index.add(entry["id"], "\n".join([entry["title"], entry["description"], text]))
+
+    def _remove_previews(self, digest):
+        for size in PREVIEW_SIZES:
+            if cached_preview(self.preview_dir, digest, size):
+                os.remove(preview_path(self.preview_dir, digest, size))
+
+    def _migrate(self):
+        """
+        Eski kayıtlar (upload_dir/filename, id'siz) içerik adresli depoya taşınır. Taşıma günlük
+        kilidi altında sıkıştırmayla birlikte yapılır (aynı anda açılan oturumlar tekrar taşımaz).
+        Aynı isimli eski kayıtlar aynı dosyayı gösterdiğinden dosyalar hepsi taşındıktan sonra silinir.
+        """
+        if all("id" in entry for entry in self.entries):
+            return
+        moved = set()
+
+        def migrate(entries):
+            for entry in entries:
+                if "id" not in entry:
+                    self._migrate_entry(entry, moved)
+            return entries
+
+        self.log.compact(migrate)
+        for legacy_path in moved:
+            os.remove(legacy_path)
+
+    def _migrate_entry(self, entry, moved):
+        entry["id"] = uuid.uuid4().hex
+        legacy_path = os.path.join(self.upload_dir, entry["filename"])
+        if not os.path.exists(legacy_path):
+            entry.pop("sha256", None)
+            return
+        digest, size, _ = self.blobs.put_file(legacy_path)
+        build_previews(self.blobs.path(digest), entry["filename"], digest, self.preview_dir)
+        entry.update(sha256=digest, size=size)
+        moved.add(legacy_path)
+
+    def sync(self):
+        """
+        Eski kayıtları taşır, indekste olmayan kayıtları ekler, kaydı silinmiş belgeleri
+        indeksten çıkarır (yalnızca farklar işlenir).
+        """
+        self._migrate()
+        indexed = self.index.documents()
+        for entry in self.entries:
+            if entry["id"] not in indexed and os.path.exists(self.path(entry)):
+                self._index_entry(entry)
+        for doc in indexed - {entry["id"] for entry in self.entries}:
+            self.index.remove(doc)
+
+    def preview(self, entry, size):
+        """
+        Önbellekteki küçük resim / önizleme yolu; üretilemediyse None.
+        """
+        if "sha256" not in entry:
+            return None
+        return cached_preview(self.preview_dir, entry["sha256"], size)
+
+    def search(self, query, limit=20):
+        return self.index.search(query, limit)
+
+    def add(self, uploaded_file, title, description, uploader):
+        """
+        Yüklenen dosya parça parça içerik adresli depoya yazılır (özet yazarken hesaplanır).
+        Aynı içerik bu projede zaten kayıtlıysa kayıt eklenmez.
+        Geri dönüş: (yeni kayıt / None, bu projedeki aynı içerikli kayıtlar, içerik depoda zaten var mıydı)
+        """
+        uploaded_file.seek(0)
+        # put referansı dosyanın varlığıyla aynı kilit altında alır; yinelenen kayıtta geri verilir
+        digest, size, existed = self.blobs.put(uploaded_file)
+        duplicates = self.duplicates(digest)
+        if duplicates:
+            self.blobs.release(digest, on_release=self._remove_previews)
+            return None, duplicates, existed
+
+        entry = {
+            "id": uuid.uuid4().hex,
+            "filename": uploaded_file.name,
+            "title": title,
+            "description": description,
+            "uploader": uploader,
+            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "sha256": digest,
+            "size": size
+        }
+        self.log.add(entry)
+        build_previews(self.path(entry), entry["filename"], digest, self.preview_dir)
+        self._index_entry(entry)
+        return entry, [], existed
+
+    def delete(self, entry_id):
+        # Kayıt kilit altında id ile silinir; başka oturum zaten sildiyse referans iki kez düşmez
+        removed = self.log.delete(entry_id)
+        if removed is None:
+            return
+        self.index.remove(entry_id)
+        # Son referanssa dosya ve önizlemeleri silinir
+        if "sha256" in removed:
+            self.blobs.release(removed["sha256"], on_release=self._remove_previews)
+
+    def opener(self, entry):
+        """
+        İndirme butonu için gecikmeli veri kaynağı: dosya yalnızca tıklandığında açılır.
+        """
+        path = self.path(entry)
+
+        def read():
+            with open(path, "rb") as f:
+                return f.read()
+        return read
+
+
+# ---------------------------
+# 🖥️ Ortak sayfa: yükleme + dosya listesi
+# ---------------------------
+def file_uploader(store):
+    st.subheader("📤 Upload a new literature file")
+
+    uploaded_file = st.file_uploader("Upload file", type=ACCEPTED_TYPES, label_visibility="collapsed")
+    title = st.text_input("Enter a title for this file")
+    description = st.text_area("Enter a description for this file")
+
+    if st.button("Upload") and uploaded_file and title:
+        entry, duplicates, existed = store.add(
+            uploaded_file, title, description, st.session_state.get("username", "anonymous")
+        )
+        if duplicates:
+            st.warning(f"⚠️ This file is already in the list as \"{duplicates[0]['title']}\" ({duplicates[0]['filename']}).")
+            return
+        if existed:
+            st.info("ℹ️ Identical file already stored for another project; it was linked without using extra disk space.")
+        st.success("File uploaded successfully.")
+        st.rerun()
+
+
+def search_panel(store):
+    st.subheader("🔎 Search literature")
+    query = st.text_input(
+        "Search titles, descriptions and file contents", key="literature_query", label_visibility="collapsed",
+        placeholder="Search titles, descriptions and file contents"
+    ).strip()
+    if not query:
+        return
+    hits = store.search(query)
+    if not hits:
+        st.info("ℹ️ No matching files.")
+    for entry_id, score, excerpt in hits:
+        entry = store.entry(entry_id)
+        if entry is None:
+            continue
+        st.markdown(f"**{entry['title']}** · {entry['filename']} · score {score:.2f}  \n{excerpt}")
+    st.markdown("---")
+
+
+def display_uploaded_files(store):
+    st.subheader("📁 Uploaded Files")
+    for file in store.entries:
+        col0, col1, col2, col3, col4, col5, col6, col7, col8 = st.columns([1, 2, 2, 3, 2, 2, 1, 1, 1])
+        # Küçük resim önbellekten (birkaç KB); orijinal dosya açılmaz
+        thumbnail = store.preview(file, "thumb")
+        if thumbnail:
+            col0.image(thumbnail)
+        col1.write(f"**Original:** {file['filename']}")
+        col2.write(f"**Title:** {file['title']}")
+        col3.write(f"**Description:** {file['description']}")
+        col4.write(f"**Uploader:** {file['uploader']}")
+        col5.write(f"**Date:** {file['timestamp']}")
+
+        # Delete button
+        if col6.button("❌", key=f"delete_{file['id']}"):
+            store.delete(file["id"])
+            st.rerun()
+
+        # Download button: içerik tıklanınca okunur, sayfa yeniden çalışmaz
+        col7.download_button(
+            "📥",
+            data=store.opener(file),
+            file_name=file["filename"],
+            mime="application/octet-stream",
+            key=f"download_{file['id']}",
+            on_click="ignore"
+        )
+
+        # Preview toggle button
+        if col8.button("👁️", key=f"preview_{file['id']}"):
+            st.session_state[f"show_preview_{file['id']}"] = not st.session_state.get(f"show_preview_{file['id']}", False)
+
+        # Conditional preview section
+        if st.session_state.get(f"show_preview_{file['id']}", False):
+            st.markdown(f"### 👁️ Preview: {file['title']}")
+            preview = store.preview(file, "preview")
+            if preview:
+                st.image(preview)
+            else:
+                st.markdown(
+                    "<div style='text-align: center; padding: 1em; border: 2px dashed #999; "
+                    "border-radius: 10px; background-color: #1e1e1e; color: #ddd;'>"
+                    "🔒 <strong>Preview not available for this file type.</strong></div>",
+                    unsafe_allow_html=True
+                )
+            st.markdown("---")
+
+
+@st.cache_resource
+def shared_literature_store(upload_dir, metadata_file):
+    """
+    Süreç başına tek kayıt deposu: tüm oturumlar aynı bellek içi görünümü paylaşır;
+    eski kayıt taşıma ve indeks eşitleme süreç başlarken bir kez yapılır.
+    """
+    store = LiteratureStore(upload_dir, metadata_file)
+    store.sync()
+    return store
+
+
+def literature_reviewer(upload_dir, metadata_file):
+    store = shared_literature_store(upload_dir, metadata_file)
+    file_uploader(store)
+    search_panel(store)
+    display_uploaded_files(store)
@@ -0,0 +1,129 @@
+# material_db.py
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import numpy as np
+
+from material_store import MaterialStore
+from pipeline_cache import input_key
+
+MATERIAL_DB_PATH = os.environ.get(
+    "MATERIAL_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "materials.db")
+)
+
+
+# ---------------------------
+# 🗃️ Süreç başına paylaşılan malzeme veritabanı (SQLite)
+# ---------------------------
+class SharedMaterialDB:
+    """
+    Gömülü ve Excel'den yüklenen referans kompozitler diskte tek bir SQLite dosyasında
+    tutulur: her kompozit için min / max değerleri float64 BLOB olarak (özellik sırası
+    meta tablosunda). Bellekteki kopya ilk erişimde yüklenen, değişmez bir MaterialStore
+    anlık görüntüsüdür; tüm oturumlar aynı nesneyi okur.
+    Yazmalar kilit altında yeni bir anlık görüntü üretir (eski görüntüyü okuyan oturumlar
+    etkilenmez) ve version artar.
+    """
+
+    def __init__(self, path, properties):
+        self.path = path
+        self.properties = list(properties)
+        self.lock = threading.Lock()
+        self.version = 0
+        self._snapshot = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("CREATE TABLE IF NOT EXISTS composites (name TEXT PRIMARY KEY, mins BLOB, maxs BLOB)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    @staticmethod
+    def _meta(conn, key, default=None):
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    @staticmethod
+    def _set_meta(conn, key, value):
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, json.dumps(value))
+        )
+
+    def _publish(self, store):
+        self.version += 1
+        store.version = self.version
+        self._snapshot = store
+        return store
+
+    def _load(self):
+        with closing(self._connect()) as conn:
+            stored_props = self._meta(conn, "properties", [])
+            records = conn.execute("SELECT name, mins, maxs FROM composites ORDER BY rowid").fetchall()
+
+        names = [name for name, _, _ in records]
+        width = max(len(stored_props), 1)
+        raw_mins = np.frombuffer(b"".join(r[1] for r in records), dtype="<f8").reshape(-1, width)
+        raw_maxs = np.frombuffer(b"".join(r[2] for r in records), dtype="<f8").reshape(-1, width)
+
+        # Kayıtlı özellik sırası koddakinden farklıysa kolonlar isimle eşlenir (yeni özellik → NaN)
+        mins = np.full((len(names), len(self.properties)), np.nan)
+        maxs = np.full((len(names), len(self.properties)), np.nan)
+        for j, prop in enumerate(self.properties):
+            if prop in stored_props:
+                mins[:, j] = raw_mins[:, stored_props.index(prop)]
+                maxs[:, j] = raw_maxs[:, stored_props.index(prop)]
+        return self._publish(MaterialStore(self.properties, names, mins, maxs))
+
+    def snapshot(self):
+        """
+        Güncel anlık görüntü (salt okunur). İlk çağrıda diskten yüklenir.
+        """
+        if self._snapshot is None:
+            with self.lock:
+                if self._snapshot is None:
+                    self._load()
+        return self._snapshot
+
+    def add_many(self, names, mins, maxs):
+        with self.lock:
+            current = self._snapshot if self._snapshot is not None else self._load()
+            # Paylaşılan diziler yerinde değiştirilmez: kopya üzerinde güncellenip yayınlanır
+            store = MaterialStore(self.properties, current.names, current.mins.copy(), current.maxs.copy())
+            store.add_many(names, mins, maxs)
+
+            written = list(dict.fromkeys(names))
+            rows = store.rows(written)
+            with closing(self._connect()) as conn, conn:
+                if self._meta(conn, "properties") != self.properties:
+                    # Özellik listesi değişti: tablo güncel sırayla yeniden yazılır
+                    conn.execute("DELETE FROM composites")
+                    self._set_meta(conn, "properties", self.properties)
+                    written, rows = store.names, np.arange(len(store))
+                conn.executemany(
+                    "INSERT INTO composites (name, mins, maxs) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET mins = excluded.mins, maxs = excluded.maxs",
+                    (
+                        (name, store.mins[row].astype("<f8").tobytes(), store.maxs[row].astype("<f8").tobytes())
+                        for name, row in zip(written, rows)
+                    )
+                )
+            return self._publish(store)
+
+    def seed(self, datasets):
+        """
+        Gömülü veri setini yazar; yalnızca veri seti değiştiğinde (özet farklıysa) diske dokunur.
+        """
+        key = input_key(datasets, self.properties)
+        with closing(self._connect()) as conn:
+            if self._meta(conn, "seed") == key:
+                return
+        names = list(datasets.keys())
+        mins, maxs = MaterialStore._entries_to_arrays([datasets[name] for name in names], self.properties)
+        self.add_many(names, mins, maxs)
+        with closing(self._connect()) as conn, conn:
+            self._set_meta(conn, "seed", key)
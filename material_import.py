@@ -0,0 +1,325 @@
+# material_import.py
+import posixpath
+import re
+import zipfile
+from xml.etree.ElementTree import iterparse, parse
+from xml.sax.saxutils import unescape
+
+import numpy as np
+
+MAIN_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# <c r="B12" s="1" t="s"><v>3</v></c> | <c r="C5"/> — hücre başına tek eşleşme, tip öznitelikte
+CELL_RE = re.compile(rb'<c r="([A-Z]+)(\d+)"([^>]*)>(?:<f[^>]*/>|<f[^>]*>[^<]*</f>)?(?:<v>([^<]*)</v>)?')
+# <c r="A2" t="inlineStr"><is><t>Name</t></is></c> — yalnızca parçada satır içi metin varsa taranır
+INLINE_RE = re.compile(rb'<c r="([A-Z]+)(\d+)"[^>]*\bt="inlineStr"[^>]*><is>(.*?)</is>', re.S)
+INLINE_TEXT_RE = re.compile(rb'<t[^>]*>([^<]*)</t>')
+# Ön ekli kök öğe (<x:worksheet ...>): hızlı yolun kalıpları ön eksiz etiket varsayar
+PREFIXED_SHEET_RE = re.compile(rb"<[A-Za-z_][\w.-]*:worksheet[\s>]")
+
+NA_STRINGS = {"", "n/a", "na", "-", "none", "nan"}
+# Ondalık virgül yalnızca tek ayraçsa kabul edilir; "1,000" gibi binlik gruplaması belirsizdir
+DECIMAL_COMMA_RE = re.compile(r"[+-]?\d*,\d+(?:[eE][+-]?\d+)?")
+THOUSANDS_RE = re.compile(r"[+-]?[1-9]\d{0,2},\d{3}")
+MAX_ERRORS = 10000
+XML_CHUNK_BYTES = 1 << 21
+FALLBACK_CHUNK_ROWS = 4096
+
+
+class _FastPathMismatch(ValueError):
+    """
+    Sayfa XML'i hızlı yolun varsaydığı biçimde değil; içe aktarma openpyxl ile baştan yapılır.
+    """
+
+
+# ---------------------------
+# 🔧 Yardımcılar
+# ---------------------------
+def _column_index(letters):
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index - 1
+
+
+def _column_letters(index):
+    letters = ""
+    index += 1
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def _parse_number(text):
+    text = str(text).strip()
+    if text.lower() in NA_STRINGS:
+        return np.nan, True
+    if "," in text:
+        # Nokta + virgül, birden fazla virgül veya binlik grubu gibi görünen değer tahmin edilmez
+        if not DECIMAL_COMMA_RE.fullmatch(text) or THOUSANDS_RE.fullmatch(text):
+            return np.nan, False
+        text = text.replace(",", ".")
+    try:
+        return float(text), True
+    except ValueError:
+        return np.nan, False
+
+
+# ---------------------------
+# 📄 Hızlı yol: sayfa XML'ini parça parça regex ile tara
+# ---------------------------
+def _sheet_path(archive, sheet_name):
+    workbook = parse(archive.open("xl/workbook.xml")).getroot()
+    rels = parse(archive.open("xl/_rels/workbook.xml.rels")).getroot()
+    targets = {rel.get("Id"): rel.get("Target") for rel in rels.iter(PKG_REL_NS + "Relationship")}
+    sheets = list(workbook.iter(MAIN_NS + "sheet"))
+    chosen = next((sh for sh in sheets if sh.get("name") == sheet_name), sheets[0])
+    target = targets[chosen.get(DOC_REL_NS + "id")]
+    return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+
+
+def _shared_strings(archive):
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    for _, elem in iterparse(archive.open("xl/sharedStrings.xml")):
+        if elem.tag == MAIN_NS + "si":
+            strings.append("".join(t.text or "" for t in elem.iter(MAIN_NS + "t")))
+            elem.clear()
+    return strings
+
+
+def _xml_chunks(archive, sheet_path):
+    # Parçalar her zaman bir </row> sonunda kesilir; bellek XML_CHUNK_BYTES ile sınırlı
+    with archive.open(sheet_path) as stream:
+        rest = b""
+        first = True
+        while True:
+            block = stream.read(XML_CHUNK_BYTES)
+            if not block:
+                break
+            if first and PREFIXED_SHEET_RE.search(block):
+                raise _FastPathMismatch("Namespace-prefixed sheet XML")
+            first = False
+            buffer = rest + block
+            cut = buffer.rfind(b"</row>")
+            if cut < 0:
+                rest = buffer
+                continue
+            cut += len(b"</row>")
+            yield buffer[:cut]
+            rest = buffer[cut:]
+        if rest:
+            yield rest
+
+
+def _fast_cell_chunks(archive, sheet_path, shared):
+    """
+    Her parça için: (satır no, kolon no, sayısal değer (sayı değilse NaN), {konum: metin})
+    Kalıp yalnızca r="…" ilk öznitelik olan hücreleri tanır; parçadaki <c> etiketlerinin hepsi
+    eşleşmediyse (öznitelik sırası farklı, r yok...) _FastPathMismatch ile openpyxl'e dönülür.
+    """
+    for xml in _xml_chunks(archive, sheet_path):
+        cells = CELL_RE.findall(xml)
+        if len(cells) != xml.count(b"<c ") + xml.count(b"<c>") + xml.count(b"<c/>"):
+            raise _FastPathMismatch("Sheet cells the fast reader cannot address")
+        if not cells:
+            continue
+        letters, row_no, attrs, values = zip(*cells)
+
+        # Kolon harfleri az sayıda: sözlükle koda, kodlardan kolon indeksine
+        letter_codes = {}
+        codes = np.fromiter((letter_codes.setdefault(l, len(letter_codes)) for l in letters), dtype=np.intp, count=len(letters))
+        cols = np.array([_column_index(l.decode()) for l in letter_codes])[codes]
+        rows = np.array(row_no).astype(np.int64)
+        attrs = np.array(attrs)
+        values = np.array(values)
+
+        is_shared = np.char.find(attrs, b't="s"') >= 0
+        is_inline = np.char.find(attrs, b't="inlineStr"') >= 0
+        is_text = is_shared | is_inline | (np.char.find(attrs, b't="') >= 0) & (np.char.find(attrs, b't="n"') < 0)
+
+        numbers = np.full(len(cells), np.nan)
+        numeric = ~is_text & (values != b"")
+        numbers[numeric] = values[numeric].astype(float)
+
+        texts = {}
+        for i in np.flatnonzero(is_shared):
+            texts[i] = shared[int(values[i])]
+        for i in np.flatnonzero(is_text & ~is_shared & ~is_inline & (values != b"")):
+            texts[i] = unescape(values[i].decode("utf-8"))
+        if is_inline.any():
+            inline = {
+                (l, r): unescape(b"".join(INLINE_TEXT_RE.findall(body)).decode("utf-8"))
+                for l, r, body in INLINE_RE.findall(xml)
+            }
+            for i in np.flatnonzero(is_inline):
+                texts[i] = inline.get((letters[i], row_no[i]), "")
+        yield rows, cols, numbers, texts
+
+
+# ---------------------------
+# 🐢 Yedek yol: openpyxl read-only akışı
+# ---------------------------
+def _openpyxl_cell_chunks(file, sheet_name):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    sheet = workbook[sheet_name] if sheet_name in workbook.sheetnames else workbook.worksheets[0]
+    rows, cols, numbers, texts = [], [], [], {}
+    for row_no, row in enumerate(sheet.iter_rows(values_only=True), 1):
+        for col, value in enumerate(row):
+            if value is None:
+                continue
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                numbers.append(float(value))
+            else:
+                texts[len(numbers)] = str(value)
+                numbers.append(np.nan)
+            rows.append(row_no)
+            cols.append(col)
+        if len(rows) and row_no % FALLBACK_CHUNK_ROWS == 0:
+            yield np.array(rows), np.array(cols), np.array(numbers), texts
+            rows, cols, numbers, texts = [], [], [], {}
+    if rows:
+        yield np.array(rows), np.array(cols), np.array(numbers), texts
+    workbook.close()
+
+
+# ---------------------------
+# 📥 Doğrulamalı akış içe aktarımı
+# ---------------------------
+def import_excel(file, properties, sheet_name="Template"):
+    """
+    generate_excel_template düzenindeki çalışma kitabını satır parçaları halinde okur ve
+    kolonları doğrudan özellik matrislerine yazar. Sayısal olmayan değerler, min > max,
+    tek taraflı aralıklar, eksik isim ve eksik kolonlar hücre bazında raporlanır; hatalı
+    hücreler N/A olarak içe aktarılır.
+    Geri dönüş: (isimler, mins, maxs, hatalar) — hatalar en fazla MAX_ERRORS kayıt.
+    Önce hızlı yol (regex) denenir; başlık şablonla eşleşmezse veya herhangi bir parça
+    çözülemezse dosya baştan openpyxl ile okunur.
+    """
+    try:
+        archive = zipfile.ZipFile(file)
+        chunks = _fast_cell_chunks(archive, _sheet_path(archive, sheet_name), _shared_strings(archive))
+        return _import_chunks(chunks, properties, fast=True)
+    except (zipfile.BadZipFile, KeyError, IndexError, ValueError):
+        if hasattr(file, "seek"):
+            file.seek(0)
+        return _import_chunks(_openpyxl_cell_chunks(file, sheet_name), properties)
+
+
+def _import_chunks(chunks, properties, fast=False):
+    n_props = len(properties)
+    errors = []
+
+    def report(row, column, value, message):
+        if len(errors) < MAX_ERRORS:
+            errors.append({"Row": row, "Column": column, "Value": value, "Error": message})
+        elif len(errors) == MAX_ERRORS:
+            errors.append({"Row": None, "Column": None, "Value": None, "Error": "Too many errors, report truncated."})
+
+    names, mins_parts, maxs_parts = [], [], []
+    header = None
+    col_prop = col_bound = None
+    name_col = None
+    column_labels = {}
+
+    for rows, cols, numbers, texts in chunks:
+        if header is None:
+            # 🧾 Başlık: ilk dolu satır
+            header_row = rows.min()
+            header = {cols[i]: str(texts.get(i, numbers[i])).strip() for i in np.flatnonzero(rows == header_row)}
+            by_label = {label: col for col, label in header.items()}
+            column_labels = header
+
+            # Hızlı yolda eksik kolon, okuyucunun hücreleri kaçırdığı anlamına gelebilir: openpyxl karar verir
+            template = ["Name"] + [f"{prop} {suffix}" for prop in properties for suffix in ("min", "max")]
+            if fast and any(label not in by_label for label in template):
+                raise _FastPathMismatch("Header does not match the template")
+
+            n_cols = max(header) + 1 if header else 0
+            col_prop = np.full(n_cols, -1)
+            col_bound = np.full(n_cols, -1)
+            for j, prop in enumerate(properties):
+                for bound, suffix in enumerate(("min", "max")):
+                    label = f"{prop} {suffix}"
+                    if label in by_label:
+                        col_prop[by_label[label]] = j
+                        col_bound[by_label[label]] = bound
+                    else:
+                        report(int(header_row), label, None, "Missing column")
+            name_col = by_label.get("Name")
+            if name_col is None:
+                report(int(header_row), "Name", None, "Missing column")
+                return [], np.empty((0, n_props)), np.empty((0, n_props)), errors
+
+        # Başlık satırı (ve öncesi) veri değildir
+        data = rows > header_row
+        if not data.all():
+            keep = np.flatnonzero(data)
+            texts = {new: texts[old] for new, old in enumerate(keep) if old in texts}
+            rows, cols, numbers = rows[keep], cols[keep], numbers[keep]
+        if not len(rows):
+            continue
+
+        # 🔢 Parça içi satırlar
+        unique_rows, local = np.unique(rows, return_inverse=True)
+        m = len(unique_rows)
+        chunk_mins = np.full((m, n_props), np.nan)
+        chunk_maxs = np.full((m, n_props), np.nan)
+        chunk_names = [None] * m
+        chunk_bad = np.zeros((m, n_props), dtype=bool)
+
+        in_range = cols < len(col_prop)
+        prop_of = np.where(in_range, col_prop[np.minimum(cols, len(col_prop) - 1)], -1)
+        bound_of = np.where(in_range, col_bound[np.minimum(cols, len(col_bound) - 1)], -1)
+
+        for bound, target in ((0, chunk_mins), (1, chunk_maxs)):
+            sel = bound_of == bound
+            target[local[sel], prop_of[sel]] = numbers[sel]
+
+        for i, text in texts.items():
+            if cols[i] == name_col:
+                chunk_names[local[i]] = text.strip()
+            elif prop_of[i] >= 0:
+                value, ok = _parse_number(text)
+                if not ok:
+                    report(int(rows[i]), column_labels.get(cols[i], _column_letters(cols[i])), text, "Non-numeric value")
+                    chunk_bad[local[i], prop_of[i]] = True
+                (chunk_mins if bound_of[i] == 0 else chunk_maxs)[local[i], prop_of[i]] = value
+
+        for i in np.flatnonzero((cols == name_col) & ~np.isnan(numbers)):
+            chunk_names[local[i]] = f"{numbers[i]:g}"
+
+        # ✅ Aralık doğrulaması (vektörel)
+        inverted = chunk_mins > chunk_maxs
+        one_sided = (np.isnan(chunk_mins) ^ np.isnan(chunk_maxs)) & ~chunk_bad
+        for r, j in zip(*np.nonzero(inverted)):
+            report(int(unique_rows[r]), properties[j], f"{chunk_mins[r, j]:g} > {chunk_maxs[r, j]:g}", "Min greater than max")
+        for r, j in zip(*np.nonzero(one_sided)):
+            missing_bound = "max" if np.isnan(chunk_maxs[r, j]) else "min"
+            report(int(unique_rows[r]), f"{properties[j]} {missing_bound}", None, f"Missing {missing_bound} value")
+        invalid = inverted | one_sided | chunk_bad
+        chunk_mins[invalid] = np.nan
+        chunk_maxs[invalid] = np.nan
+
+        # İsimsiz satırlar içe aktarılmaz
+        named = np.array([name is not None and name != "" for name in chunk_names], dtype=bool)
+        for r in np.flatnonzero(~named):
+            report(int(unique_rows[r]), "Name", None, "Missing name, row skipped")
+
+        names.extend(name for name, ok in zip(chunk_names, named) if ok)
+        mins_parts.append(chunk_mins[named])
+        maxs_parts.append(chunk_maxs[named])
+
+    if header is None:
+        if fast:
+            raise _FastPathMismatch("No cells found")
+        report(None, None, None, "Empty workbook")
+    if not mins_parts:
+        return names, np.empty((0, n_props)), np.empty((0, n_props)), errors
+    return names, np.vstack(mins_parts), np.vstack(maxs_parts), errors
@@ -0,0 +1,228 @@
+# material_store.py
+import numpy as np
+
+
+# ---------------------------
+# 📦 Kolon bazlı malzeme deposu
+# ---------------------------
+class MaterialStore:
+    """
+    Kompozit özelliklerini (malzeme × özellik) iki float matris halinde tutar.
+    - mins / maxs: aralıkların alt ve üst sınırları (eksikse NaN)
+    - missing: eksik (None / N/A) hücreler için bool maske
+    - names / name_index: satır ↔ isim eşlemesi
+    Satırlar yalnızca eklenir veya yerinde güncellenir; satır indeksleri kalıcıdır.
+    Her yazma işleminde version artar (türetilmiş indeksler bunu kontrol eder).
+    """
+
+    def __init__(self, properties, names=None, mins=None, maxs=None):
+        self.properties = list(properties)
+        self.prop_index = {prop: j for j, prop in enumerate(self.properties)}
+        n_props = len(self.properties)
+
+        self.names = list(names) if names is not None else []
+        self.name_index = {name: i for i, name in enumerate(self.names)}
+        if mins is None:
+            mins = np.empty((0, n_props), dtype=float)
+        if maxs is None:
+            maxs = np.empty((0, n_props), dtype=float)
+        self.mins = np.asarray(mins, dtype=float).reshape(-1, n_props)
+        self.maxs = np.asarray(maxs, dtype=float).reshape(-1, n_props)
+        self.missing = np.isnan(self.mins) | np.isnan(self.maxs)
+        self.version = 0
+
+    @classmethod
+    def from_dict(cls, datasets, properties):
+        store = cls(properties)
+        names = list(datasets.keys())
+        mins, maxs = cls._entries_to_arrays([datasets[name] for name in names], store.properties)
+        store.add_many(names, mins, maxs)
+        return store
+
+    @staticmethod
+    def _entries_to_arrays(entries, properties):
+        mins = np.full((len(entries), len(properties)), np.nan)
+        maxs = np.full((len(entries), len(properties)), np.nan)
+        for i, entry in enumerate(entries):
+            for j, prop in enumerate(properties):
+                val = entry.get(prop)
+                if val is None:
+                    continue
+                if isinstance(val, tuple):
+                    mins[i, j], maxs[i, j] = val
+                else:
+                    mins[i, j] = maxs[i, j] = val
+        return mins, maxs
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.name_index
+
+    # --- Yazma ---
+    def add(self, name, entry):
+        mins, maxs = self._entries_to_arrays([entry], self.properties)
+        self.add_many([name], mins, maxs)
+
+    def add_many(self, names, mins, maxs):
+        mins = np.asarray(mins, dtype=float).reshape(-1, len(self.properties))
+        maxs = np.asarray(maxs, dtype=float).reshape(-1, len(self.properties))
+
+        # Aynı isim tekrar gelirse (dict davranışı gibi) son kayıt geçerli olur
+        new_rows = {}
+        update_rows, update_src = [], []
+        for k, name in enumerate(names):
+            row = self.name_index.get(name)
+            if row is not None:
+                update_rows.append(row)
+                update_src.append(k)
+            else:
+                new_rows[name] = k
+        if update_rows:
+            self.mins[update_rows] = mins[update_src]
+            self.maxs[update_rows] = maxs[update_src]
+
+        if new_rows:
+            src = list(new_rows.values())
+            start = len(self.names)
+            for offset, name in enumerate(new_rows):
+                self.name_index[name] = start + offset
+                self.names.append(name)
+            self.mins = np.vstack([self.mins, mins[src]])
+            self.maxs = np.vstack([self.maxs, maxs[src]])
+
+        self.missing = np.isnan(self.mins) | np.isnan(self.maxs)
+        self.version += 1
+
+    # --- Okuma ---
+    def rows(self, names):
+        return np.fromiter((self.name_index[name] for name in names), dtype=np.intp, count=len(names))
+
+    def names_at(self, rows):
+        return [self.names[i] for i in rows]
+
+    def columns(self, props):
+        return np.fromiter((self.prop_index[prop] for prop in props), dtype=np.intp, count=len(props))
+
+    def ranges(self, rows=None, cols=None):
+        """
+        (satır × kolon) alt matrisleri: (mins, maxs). None → tümü.
+        """
+        mins, maxs = self.mins, self.maxs
+        if rows is not None:
+            mins, maxs = mins[rows], maxs[rows]
+        if cols is not None:
+            mins, maxs = mins[:, cols], maxs[:, cols]
+        return mins, maxs
+
+    def column(self, prop, rows=None):
+        mins, maxs = self.ranges(rows, [self.prop_index[prop]])
+        mins, maxs = mins[:, 0], maxs[:, 0]
+        return mins, maxs, np.isnan(mins) | np.isnan(maxs)
+
+    def midpoints(self, rows=None):
+        mins, maxs = self.ranges(rows)
+        return (mins + maxs) / 2
+
+    def get(self, name, prop):
+        mins, maxs = self.ranges(self.rows([name]), [self.prop_index[prop]])
+        low, high = mins[0, 0].item(), maxs[0, 0].item()
+        if np.isnan(low) or np.isnan(high):
+            return None
+        return (low, high)
+
+    def to_dict(self):
+        rows = np.arange(len(self))
+        return {
+            name: {prop: self.get(name, prop) for prop in self.properties}
+            for name in self.names_at(rows)
+        }
+
+
+# ---------------------------
+# 🧩 Paylaşılan taban + oturum katmanı (copy-on-write)
+# ---------------------------
+class SessionMaterialStore(MaterialStore):
+    """
+    Süreç genelinde paylaşılan, salt okunur bir MaterialStore'un (base) üzerine oturum
+    başına küçük bir katman (overlay). Taban dizilerine hiç yazılmaz:
+    - tabanda olmayan yeni isimler base satırlarının ardına eklenir
+    - tabanda da bulunan isimler katmana kopyalanıp o satırı gölgeler
+    Oturumun belleği taban boyutundan bağımsızdır; yalnızca katman kadar yer tutar.
+    MaterialStore'un okuma arayüzü (ranges, column, midpoints, names_at...) aynen korunur.
+    """
+
+    def __init__(self, base):
+        # MaterialStore.__init__ çağrılmaz: matrisler base ve overlay'de tutulur
+        self.base = None
+        self.overlay = MaterialStore(base.properties)
+        self.rebase(base)
+
+    def rebase(self, base):
+        """
+        Paylaşılan veritabanı yeni bir anlık görüntü yayınladığında tabanı değiştirir.
+        """
+        if base is self.base:
+            return
+        self.base = base
+        self.properties = base.properties
+        self.prop_index = base.prop_index
+        self._layout()
+
+    def _layout(self):
+        base, overlay = self.base, self.overlay
+        shadow = sorted(
+            (base.name_index[name], k) for k, name in enumerate(overlay.names) if name in base.name_index
+        )
+        self.shadow_base = np.array([row for row, _ in shadow], dtype=np.intp)
+        self.shadow_overlay = np.array([k for _, k in shadow], dtype=np.intp)
+        self.extra = np.array(
+            [k for k, name in enumerate(overlay.names) if name not in base.name_index], dtype=np.intp
+        )
+        self.extra_index = {overlay.names[k]: len(base) + i for i, k in enumerate(self.extra)}
+        self.version = f"{base.version}.{overlay.version}"
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def __contains__(self, name):
+        return name in self.base.name_index or name in self.extra_index
+
+    # --- Yazma (yalnızca katmana) ---
+    def add_many(self, names, mins, maxs):
+        self.overlay.add_many(names, mins, maxs)
+        self._layout()
+
+    # --- Okuma ---
+    def rows(self, names):
+        base_index = self.base.name_index
+        return np.fromiter(
+            (base_index[name] if name in base_index else self.extra_index[name] for name in names),
+            dtype=np.intp, count=len(names)
+        )
+
+    def names_at(self, rows):
+        n_base = len(self.base)
+        base_names, overlay_names = self.base.names, self.overlay.names
+        return [base_names[i] if i < n_base else overlay_names[self.extra[i - n_base]] for i in rows]
+
+    def ranges(self, rows=None, cols=None):
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.intp)
+        n_base = len(self.base)
+        in_base = rows < n_base
+        if in_base.all() and not len(self.shadow_base):
+            return self.base.ranges(rows, cols)
+
+        width = len(self.properties) if cols is None else len(cols)
+        mins = np.empty((len(rows), width))
+        maxs = np.empty((len(rows), width))
+        mins[in_base], maxs[in_base] = self.base.ranges(rows[in_base], cols)
+        mins[~in_base], maxs[~in_base] = self.overlay.ranges(self.extra[rows[~in_base] - n_base], cols)
+
+        # Gölgelenen taban satırları katmandaki kopyadan okunur
+        if len(self.shadow_base):
+            pos = np.minimum(np.searchsorted(self.shadow_base, rows), len(self.shadow_base) - 1)
+            hit = in_base & (self.shadow_base[pos] == rows)
+            mins[hit], maxs[hit] = self.overlay.ranges(self.shadow_overlay[pos[hit]], cols)
+        return mins, maxs
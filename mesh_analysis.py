@@ -0,0 +1,277 @@
+# mesh_analysis.py
+import base64
+import hashlib
+import io
+import os
+import posixpath
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Binary STL: 80 bayt başlık + uint32 üçgen sayısı, ardından üçgen başına 50 bayt
+STL_HEADER_BYTES = 84
+STL_TRIANGLE = np.dtype([("normal", "<f4", (3,)), ("vertices", "<f4", (3, 3)), ("attr", "<u2")])
+VOLUME_CHUNK = 1 << 20
+SPOOL_BLOCK = 1 << 20
+# Kümeleme ızgarası üst sınırı: hücre anahtarı (x*g+y)*g+z int64'e sığar (g³ = 2**60)
+MAX_GRID = 1 << 20
+
+
+# ---------------------------
+# 📦 Girdi tamponu
+# ---------------------------
+def _buffer(source):
+    """
+    Dosya yolu (diske alınmış parça) → np.memmap (diskten sayfa sayfa), bayt (önizleme) → kopyasız görünüm.
+    İçerik özeti diske alma sırasında hesaplanır (bkz. _spool).
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return np.memmap(source, dtype=np.uint8, mode="r")
+    return np.frombuffer(source, dtype=np.uint8)
+
+
+# ---------------------------
+# 📐 Binary STL okuyucu (trimesh nesnesi kurmadan)
+# ---------------------------
+def binary_triangles(data):
+    """
+    Geçerli bir binary STL ise (n, 3, 3) float32 köşe görünümü (kopya yok), değilse None.
+    """
+    if len(data) < STL_HEADER_BYTES:
+        return None
+    n = int(data[80:84].view("<u4")[0])
+    expected = STL_HEADER_BYTES + n * STL_TRIANGLE.itemsize
+    # "solid" ile başlayan ve boyutu tutmayan dosyalar ASCII kabul edilir
+    if n == 0 or len(data) < expected or (len(data) != expected and bytes(data[:5]) == b"solid"):
+        return None
+    return data[STL_HEADER_BYTES:expected].view(STL_TRIANGLE)["vertices"]
+
+
+def merge_vertices(triangles):
+    """
+    Aynı koordinattaki köşeleri birleştirir → (köşeler (V, 3) float32, yüzeyler (n, 3) int64).
+    """
+    # -0.0 → 0.0; koordinatların bit desenleri (x|y, z) iki anahtarla sıralanıp ardışık eşitler birleşir
+    points = np.ascontiguousarray(triangles.reshape(-1, 3) + np.float32(0))
+    bits = points.view(np.uint32)
+    xy = (bits[:, 0].astype(np.uint64) << np.uint64(32)) | bits[:, 1]
+    order = np.lexsort((bits[:, 2], xy))
+    xy, z = xy[order], bits[order, 2]
+    new = np.empty(len(order), dtype=bool)
+    new[0] = True
+    new[1:] = (xy[1:] != xy[:-1]) | (z[1:] != z[:-1])
+    ids = np.empty(len(order), dtype=np.int64)
+    ids[order] = np.cumsum(new) - 1
+    return points[order[new]], ids.reshape(-1, 3)
+
+
+def _is_watertight(faces):
+    """
+    Her kenar tam iki yüzeyde kullanılıyorsa kapalı (watertight) kabul edilir
+    (trimesh.is_watertight ile aynı tanım).
+    """
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    edges.sort(axis=1)
+    _, counts = np.unique(edges[:, 0] * (faces.max() + 1) + edges[:, 1], return_counts=True)
+    return bool(np.all(counts == 2))
+
+
+def _binary_properties(triangles):
+    origin = triangles[0, 0].astype(np.float64)
+    volume = 0.0
+    low = np.full(3, np.inf)
+    high = np.full(3, -np.inf)
+    # Hacim: orijine göre işaretli tetrahedron hacimleri toplamı; bellek için parça parça float64
+    for start in range(0, len(triangles), VOLUME_CHUNK):
+        tri = triangles[start:start + VOLUME_CHUNK].astype(np.float64) - origin
+        volume += np.einsum("ij,ij->", tri[:, 0], np.cross(tri[:, 1], tri[:, 2])) / 6.0
+        flat = tri.reshape(-1, 3)
+        low = np.minimum(low, flat.min(axis=0))
+        high = np.maximum(high, flat.max(axis=0))
+    return {
+        "volume_mm3": float(volume),
+        "extents": (high - low).tolist(),
+        "triangles": len(triangles),
+        "watertight": _is_watertight(merge_vertices(triangles)[1]),
+        "reader": "binary"
+    }
+
+
+def _trimesh_properties(source, data):
+    import trimesh
+
+    file_obj = source if isinstance(source, (str, os.PathLike)) else io.BytesIO(data.tobytes())
+    mesh = trimesh.load(file_obj, file_type="stl", force="mesh")
+    return {
+        "volume_mm3": float(mesh.volume),
+        "extents": [float(x) for x in mesh.bounding_box.extents],
+        "triangles": len(mesh.faces),
+        "watertight": bool(mesh.is_watertight),
+        "reader": "trimesh"
+    }
+
+
+def mesh_properties(source):
+    """
+    STL'den hacim (mm³), sınır kutusu boyutları, üçgen sayısı ve kapalılık bilgisi.
+    Binary dosyalar doğrudan üçgen tamponundan okunur; ASCII veya bozuk dosyalar trimesh ile.
+    """
+    data = _buffer(source)
+    triangles = binary_triangles(data)
+    if triangles is not None and np.isfinite(triangles).all():
+        return _binary_properties(triangles)
+    return _trimesh_properties(source, data)
+
+
+# ---------------------------
+# 🧰 Çok parçalı yükleme: diske alma + süreç havuzunda paralel ölçüm
+# ---------------------------
+def _spool(stream, path):
+    digest = hashlib.sha256()
+    with open(path, "wb") as out:
+        while True:
+            block = stream.read(SPOOL_BLOCK)
+            if not block:
+                break
+            digest.update(block)
+            out.write(block)
+    return digest.hexdigest()
+
+
+def spool_parts(uploads, directory):
+    """
+    Yüklenen STL'leri ve zip içindeki .stl üyelerini bellekte biriktirmeden diske yazar.
+    Geri dönüş: her parça için {"upload": yükleme sırası, "member": zip üyesi / None,
+    "name": parça adı, "path": geçici dosya, "digest": SHA-256}
+    """
+    parts = []
+    for k, upload in enumerate(uploads):
+        upload.seek(0)
+        if not upload.name.lower().endswith(".zip"):
+            path = os.path.join(directory, f"part_{len(parts)}.stl")
+            parts.append({"upload": k, "member": None, "name": upload.name, "path": path, "digest": _spool(upload, path)})
+            continue
+        with zipfile.ZipFile(upload) as archive:
+            for member in archive.infolist():
+                if member.is_dir() or not member.filename.lower().endswith(".stl"):
+                    continue
+                path = os.path.join(directory, f"part_{len(parts)}.stl")
+                with archive.open(member) as stream:
+                    digest = _spool(stream, path)
+                parts.append({
+                    "upload": k,
+                    "member": member.filename,
+                    "name": posixpath.basename(member.filename),
+                    "path": path,
+                    "digest": digest
+                })
+    return parts
+
+
+def _safe_mesh_properties(path):
+    # Bozuk bir parça tüm grubu düşürmesin: hata, parçanın sonucuna yazılır
+    try:
+        return mesh_properties(path)
+    except Exception as e:
+        return {"error": str(e)}
+
+
+def batch_mesh_properties(paths, max_workers=None):
+    """
+    {anahtar: dosya yolu} → {anahtar: mesh_properties}. Birden fazla parça varsa ölçümler
+    süreç havuzunda paralel yapılır; işçiler dosyaları kendi memmap'leriyle okur.
+    """
+    if len(paths) <= 1:
+        return {key: _safe_mesh_properties(path) for key, path in paths.items()}
+    workers = max_workers or min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(_safe_mesh_properties, paths.values())))
+
+
+# ---------------------------
+# 🧊 Önizleme: köşe kümeleme ile seyreltme + sıkıştırılmış yük
+# ---------------------------
+def load_triangles(source):
+    """
+    (n, 3, 3) float32 üçgenler: binary STL'de kopyasız görünüm, diğerlerinde trimesh ile.
+    """
+    data = _buffer(source)
+    triangles = binary_triangles(data)
+    if triangles is not None and np.isfinite(triangles).all():
+        return triangles
+    import trimesh
+
+    file_obj = source if isinstance(source, (str, os.PathLike)) else io.BytesIO(data.tobytes())
+    mesh = trimesh.load(file_obj, file_type="stl", force="mesh")
+    return mesh.triangles.astype(np.float32)
+
+
+def decimate(vertices, faces, budget):
+    """
+    Izgara tabanlı köşe kümeleme: aynı hücreye düşen köşeler ortalamalarında birleşir,
+    bozulan (iki köşesi aynı hücrede) ve tekrarlanan yüzeyler atılır. Hücre sayısı, yüzey
+    sayısı bütçenin altına inene kadar yüzey ~ ızgara² varsayımıyla ayarlanır. Izgara MAX_GRID
+    ile sınırlıdır; uygun sonuç bulunamazsa (ör. hacimsiz mesh'te tüm yüzeyler bozulur) mesh
+    seyreltilmeden döner.
+    """
+    if len(faces) <= budget:
+        return vertices, faces
+
+    low = vertices.min(axis=0)
+    span = max(float((vertices.max(axis=0) - low).max()), 1e-12)
+    grid = max(2, int(np.sqrt(budget)))
+    best = None
+    for _ in range(12):
+        cells = np.minimum(((vertices - low) / span * grid).astype(np.int64), grid - 1)
+        _, cluster = np.unique((cells[:, 0] * grid + cells[:, 1]) * grid + cells[:, 2], return_inverse=True)
+        clustered = cluster.reshape(-1)[faces]
+        keep = (
+            (clustered[:, 0] != clustered[:, 1])
+            & (clustered[:, 1] != clustered[:, 2])
+            & (clustered[:, 0] != clustered[:, 2])
+        )
+        count = int(keep.sum())
+        if (count <= budget or grid == 2) and (best is None or count > best[0]):
+            best = (count, cluster.reshape(-1), clustered[keep])
+        if best is not None and best[0] >= 0.8 * budget or grid == 2:
+            break
+        next_grid = min(MAX_GRID, max(2, int(grid * np.sqrt(budget / max(count, 1)) * 0.95)))
+        if next_grid == grid:
+            break
+        grid = next_grid
+
+    if best is None or best[0] == 0:
+        return vertices, faces
+    _, cluster, clustered = best
+    # Küme temsilcisi: kümedeki köşelerin ortalaması
+    sizes = np.bincount(cluster)
+    points = np.stack([np.bincount(cluster, weights=vertices[:, k]) for k in range(3)], axis=1) / np.maximum(sizes, 1)[:, None]
+
+    _, first = np.unique(np.sort(clustered, axis=1), axis=0, return_index=True)
+    clustered = clustered[np.sort(first)]
+    used, faces = np.unique(clustered, return_inverse=True)
+    return points[used].astype(np.float32), faces.reshape(-1, 3)
+
+
+def preview_payload(source, budget):
+    """
+    Önizleme için seyreltilmiş geometri: konumlar sınır kutusuna göre uint16'ya nicemlenir,
+    yüzeyler uint16 / uint32 indeks olarak gönderilir. Yük boyutu girdiden bağımsız, bütçeyle sınırlı.
+    """
+    triangles = load_triangles(source)
+    vertices, faces = decimate(*merge_vertices(triangles), budget)
+
+    offset = vertices.min(axis=0)
+    scale = max(float((vertices.max(axis=0) - offset).max()), 1e-12) / 65535
+    quantized = np.round((vertices - offset) / scale).astype("<u2")
+    index_type = "<u2" if len(vertices) <= 65536 else "<u4"
+    return {
+        "positions": base64.b64encode(quantized.tobytes()).decode(),
+        "indices": base64.b64encode(faces.astype(index_type).tobytes()).decode(),
+        "index_array": "Uint16Array" if index_type == "<u2" else "Uint32Array",
+        "offset": offset.tolist(),
+        "scale": scale,
+        "triangles": len(faces),
+        "original_triangles": len(triangles)
+    }
@@ -0,0 +1,196 @@
+# metadata_log.py
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Günlükte bu kadar işlem birikince anlık görüntüye sıkıştırılır
+COMPACT_EVERY = 500
+
+
+# ---------------------------
+# 🔒 Süreçler arası dosya kilidi
+# ---------------------------
+@contextmanager
+def file_lock(path, shared=False):
+    """
+    Kilit dosyası üzerinde paylaşımlı (okuyucu) veya özel (yazıcı) kilit.
+    Windows'ta yalnızca özel kilit vardır; shared yok sayılır.
+    """
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+# ---------------------------
+# 📜 Yalnızca ekleme yapılan işlem günlüğü + bellekte güncel görünüm
+# ---------------------------
+class MetadataLog:
+    """
+    Kayıt listesi iki dosyada tutulur: anlık görüntü (snapshot_file, eski biçimdeki JSON liste)
+    ve onun üzerine uygulanan işlem günlüğü (<ad>.log.jsonl, satır başına bir JSON işlem).
+    Ekleme / silme günlüğe tek satır yazar (kayıt sayısından bağımsız); COMPACT_EVERY
+    işlemde bir günlük anlık görüntüye sıkıştırılır. Yazıcılar <ad>.lock üzerinde özel kilit alır.
+    Bellekteki görünüm (id → kayıt) yalnızca günlüğün okunmamış kuyruğu okunarak güncellenir;
+    başka bir süreç sıkıştırma yaptıysa görünüm baştan yüklenir.
+    """
+
+    def __init__(self, snapshot_file):
+        base = os.path.splitext(snapshot_file)[0]
+        self.snapshot_file = snapshot_file
+        self.log_file = f"{base}.log.jsonl"
+        self.lock_file = f"{base}.lock"
+        self.lock = threading.RLock()
+        self.view = {}
+        # Henüz yüklenmedi: hiçbir stat sonucuna (None dahil) eşit değildir
+        self.snapshot_stamp = False
+        self.offset = 0
+        self.pending = 0
+
+    @staticmethod
+    def _stamp(path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    @staticmethod
+    def _key(entry, position):
+        # id'si olmayan eski kayıtlar, taşınana kadar sıralarıyla anahtarlanır
+        return entry.get("id") or f"legacy-{position}"
+
+    def _apply(self, op):
+        """
+        İşlemi görünüme uygular; silmede kaldırılan kayıt (zaten silinmişse None) döner.
+        """
+        if op["op"] == "add":
+            self.view[op["entry"]["id"]] = op["entry"]
+            return op["entry"]
+        return self.view.pop(op["id"], None)
+
+    def _load_snapshot(self):
+        self.snapshot_stamp = self._stamp(self.snapshot_file)
+        self.view = {}
+        self.offset = 0
+        self.pending = 0
+        if self.snapshot_stamp is not None:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                for position, entry in enumerate(json.load(f)):
+                    self.view[self._key(entry, position)] = entry
+
+    def _read_tail(self):
+        """
+        Günlükte son okunan konumdan sonraki tamamlanmış satırları uygular; yarım satır
+        (yazımı kesilmiş işlem) atlanır.
+        """
+        if not os.path.exists(self.log_file):
+            return
+        with open(self.log_file, "rb") as f:
+            f.seek(self.offset)
+            tail = f.read()
+        complete = tail[:tail.rfind(b"\n") + 1]
+        for line in complete.splitlines():
+            if line.strip():
+                self._apply(json.loads(line))
+                self.pending += 1
+        self.offset += len(complete)
+
+    def _log_size(self):
+        return os.path.getsize(self.log_file) if os.path.exists(self.log_file) else 0
+
+    def _refresh_locked(self):
+        if self._stamp(self.snapshot_file) != self.snapshot_stamp or self._log_size() < self.offset:
+            self._load_snapshot()
+        self._read_tail()
+
+    def refresh(self):
+        """
+        Değişiklik yoksa yalnızca iki stat çağrısı; varsa paylaşımlı kilitle okunur.
+        """
+        with self.lock:
+            if self._stamp(self.snapshot_file) == self.snapshot_stamp and self._log_size() == self.offset:
+                return
+            with file_lock(self.lock_file, shared=True):
+                self._refresh_locked()
+
+    def entries(self):
+        self.refresh()
+        with self.lock:
+            return list(self.view.values())
+
+    def get(self, entry_id):
+        self.refresh()
+        with self.lock:
+            return self.view.get(entry_id)
+
+    def _write_snapshot(self, entries):
+        temporary = f"{self.snapshot_file}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=4)
+        os.replace(temporary, self.snapshot_file)
+
+    def _compact_locked(self, transform=None):
+        entries = list(self.view.values())
+        if transform is not None:
+            entries = transform(entries)
+        # Önce anlık görüntü yer değiştirir, sonra günlük boşaltılır (ikisi de kilit altında)
+        self._write_snapshot(entries)
+        with open(self.log_file, "wb"):
+            pass
+        self._load_snapshot()
+
+    def append(self, op):
+        """
+        Tek işlemi günlüğe ekler ve görünüme uygular (özel kilit altında). Başka bir oturum
+        kaydı zaten silmişse silme işlemi yazılmaz ve None döner.
+        """
+        with self.lock, file_lock(self.lock_file):
+            self._refresh_locked()
+            if op["op"] == "delete" and op["id"] not in self.view:
+                return None
+            line = (json.dumps(op, ensure_ascii=False) + "\n").encode("utf-8")
+            with open(self.log_file, "ab") as f:
+                # Yarım kalmış son satır varsa (kesilmiş yazım) üzerine yazılır
+                f.truncate(self.offset)
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.offset += len(line)
+            self.pending += 1
+            result = self._apply(op)
+            if self.pending >= COMPACT_EVERY:
+                self._compact_locked()
+            return result
+
+    def add(self, entry):
+        return self.append({"op": "add", "entry": entry})
+
+    def delete(self, entry_id):
+        return self.append({"op": "delete", "id": entry_id})
+
+    def compact(self, transform=None):
+        """
+        Günlüğü anlık görüntüye sıkıştırır. transform(kayıtlar) verilirse kilit altında
+        (güncel liste üzerinde) uygulanır — ör. eski kayıtların bir kerelik taşınması.
+        """
+        with self.lock, file_lock(self.lock_file):
+            self._refresh_locked()
+            self._compact_locked(transform)
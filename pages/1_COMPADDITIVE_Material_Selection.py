@@ -2,9 +2,23 @@ import streamlit as st
 import pandas as pd
 from io import BytesIO
 import plotly.graph_objects as go
-import trimesh
-import base64
 import streamlit.components.v1 as components
+import numpy as np
+import copy
+import json
+import tempfile
+import zipfile
+from material_store import SessionMaterialStore
+from material_db import MATERIAL_DB_PATH, SharedMaterialDB
+from prescreening import DEFAULT_RULES, EDITABLE_PARAMS, evaluate_rules, pass_probabilities, describe_rule
+from scoring import CONDITION_CODES, condition_codes, score_matrix, weighted_scores, score_contributions, scenario_scores, top_k, sample_weights, rank_stability
+from filtering import PropertyIntervalIndex, rows_to_bitset, bitset_to_rows
+from pipeline_cache import PipelineCache, input_key
+from pareto import MINIMIZED_BY_DEFAULT, pareto_fronts
+from similarity import SimilarityIndex
+from imputation import IMPUTATION_METHODS, imputed_store
+from material_import import import_excel
+from mesh_analysis import spool_parts, batch_mesh_properties, preview_payload
 
 # ✅ Kullanıcı giriş kontrolü
 if "authenticated" not in st.session_state or not st.session_state.authenticated:
@@ -35,10 +49,15 @@ properties = [
 ]
 
 # ---------------------------
-# 📁 Gömülü veri seti (aynı veri)
+# 📁 Gömülü veri seti → süreç başına paylaşılan veritabanı
 # ---------------------------
-if "datasets" not in st.session_state:
-    st.session_state.datasets = {
+@st.cache_resource
+def shared_material_db():
+    """
+    Tüm oturumlar için tek veritabanı; gömülü veri yalnızca değiştiğinde diske yazılır.
+    """
+    db = SharedMaterialDB(MATERIAL_DB_PATH, properties)
+    embedded_datasets = {
         "PEKK UNFILLED": {
             "Coefficient of Thermal Expansion (CTE) (µstrain/°C)": (21, 77),
             "Cost (USD/kg)": (54.50, 81.75),
@@ -520,6 +539,49 @@ if "datasets" not in st.session_state:
             "Injection Pressure (MPa)": (68.9, 138)
         }
     }
+    db.seed(embedded_datasets)
+    return db
+
+
+material_db = shared_material_db()
+
+# Oturum yalnızca kendi el ile eklediklerini tutar; taban paylaşılan anlık görüntüdür
+if "material_store" not in st.session_state:
+    st.session_state.material_store = SessionMaterialStore(material_db.snapshot())
+store = st.session_state.material_store
+store.rebase(material_db.snapshot())
+
+# 🗄️ Aşama önbelleği: veri seti sürümü + girdi özetleri değişmedikçe yeniden hesaplama yok
+if "pipeline_cache" not in st.session_state:
+    st.session_state.pipeline_cache = PipelineCache(max_entries=8)
+cache = st.session_state.pipeline_cache
+
+
+@st.cache_resource
+def shared_stage_cache():
+    """
+    Paylaşılan tabandan türetilen O(N) yapılar (doldurulmuş kopya, aralık indeksi, KD-ağacı,
+    tablo sıralamaları) süreç başına bir kez tutulur; anahtarlar taban sürümünü içerir.
+    """
+    return PipelineCache(max_entries=2)
+
+
+shared_cache = shared_stage_cache()
+
+
+def get_or_compute_derived(stage, key, compute, max_entries=2, session_entries=1):
+    """
+    Oturum kendi satırı eklemediyse veri seti yalnızca tabandır: yapı süreç önbelleğinden okunur
+    (aynı taban sürümü için tüm oturumlar tek kopya kullanır). Eklediyse oturum önbelleğinde
+    aşama başına session_entries kayıt tutulur.
+    """
+    if not len(store.overlay):
+        return shared_cache.get_or_compute(stage, key, compute, max_entries=max_entries)
+    return cache.get_or_compute(stage, key, compute, max_entries=session_entries)
+
+
+# Tam sayfa çalıştırma sayacı: sekme fragment'ları kendi başına mı yeniden çalıştı, ayırt etmek için
+st.session_state["page_run"] = st.session_state.get("page_run", 0) + 1
 
 # ---------------------------
 # 🔧 Yardımcı: Excel şablonu
@@ -536,6 +598,148 @@ def generate_excel_template():
     output.seek(0)
     return output
 
+# ---------------------------
+# 🔧 Yardımcı: Sayfalı kompozit tablosu (kompozit × özellik min / max)
+# ---------------------------
+def imputed_view(source):
+    """
+    Eksik değerleri doldurulmuş kopya; veri seti sürümü, yöntem ve komşu sayısı değişmedikçe yeniden hesaplanmaz.
+    """
+    method = st.session_state.get("impute_method", IMPUTATION_METHODS[0])
+    n_neighbours = st.session_state.get("impute_k", 5)
+    return get_or_compute_derived(
+        "imputation", input_key(source.version, method, n_neighbours),
+        lambda: imputed_store(source, method, n_neighbours)
+    )
+
+
+def analysis_store():
+    """
+    Ön eleme ve sonraki sekmelerin okuduğu depo: doldurma açıksa doldurulmuş kopya.
+    """
+    if st.session_state.get("impute_enabled") and len(store):
+        return imputed_view(store)
+    return store
+
+
+def imputed_cells(source, rows, props):
+    """
+    Satır × özellik maskesi: doldurma açıksa tahmini (imputed) hücreler True.
+    """
+    imputed = getattr(source, "imputed", None)
+    if imputed is None:
+        return np.zeros((len(rows), len(props)), dtype=bool)
+    return imputed[np.ix_(rows, source.columns(props))]
+
+
+def name_summary(source, rows, limit=50):
+    """
+    İlk `limit` isim + "+M more": tüm isim listesi her yeniden çalıştırmada tarayıcıya gönderilmez.
+    """
+    names = ", ".join(source.names_at(rows[:limit]))
+    return names + (f" … +{len(rows) - limit:,} more" if len(rows) > limit else "")
+
+
+def candidate_table(source, rows, rows_key, key):
+    """
+    Sıralama, isim araması ve kolon seçimi sunucudaki dizilerde yapılır; yalnızca görünen
+    sayfa DataFrame'e dönüştürülüp tarayıcıya gönderilir. Biçimlendirme sadece görüntü içindir.
+    """
+    col1, col2, col3 = st.columns([2, 2, 1])
+    sort_by = col1.selectbox(
+        "Sort by", ["Database order", "Name"] + [f"{prop} {bound}" for prop in properties for bound in ("min", "max")],
+        key=f"{key}_sort"
+    )
+    descending = col1.checkbox("Descending", key=f"{key}_descending")
+    search = col2.text_input("Filter by name", key=f"{key}_search").strip().lower()
+    shown_props = col2.multiselect("Properties", properties, default=properties, key=f"{key}_columns")
+    page_size = col3.selectbox("Rows per page", [25, 50, 100, 250], key=f"{key}_page_size")
+
+    def compute_order():
+        selected = rows
+        if search or sort_by == "Name":
+            names = np.array(source.names_at(rows), dtype=str)
+            if search:
+                keep = np.char.find(np.char.lower(names), search) >= 0
+                selected, names = rows[keep], names[keep]
+        if sort_by == "Database order":
+            return selected[::-1] if descending else selected
+        if sort_by == "Name":
+            order = np.argsort(names, kind="stable")
+            return selected[order[::-1] if descending else order]
+        prop, bound = sort_by.rsplit(" ", 1)
+        mins, maxs = source.ranges(selected, [source.prop_index[prop]])
+        values = (mins if bound == "min" else maxs)[:, 0]
+        # N/A değerler her iki yönde de sona kalır (NaN argsort'ta en sondadır)
+        return selected[np.argsort(-values if descending else values, kind="stable")]
+
+    # Tablo başına bir sıralama oturumda kalır (iki tablo: candidates, passed)
+    ordered = get_or_compute_derived(
+        "table_order", input_key(rows_key, key, sort_by, descending, search), compute_order,
+        max_entries=8, session_entries=2
+    )
+
+    n_pages = max(1, -(-len(ordered) // page_size))
+    if st.session_state.get(f"{key}_page", 1) > n_pages:
+        st.session_state[f"{key}_page"] = n_pages
+    page = col3.number_input("Page", min_value=1, max_value=n_pages, step=1, key=f"{key}_page")
+    start = (page - 1) * page_size
+    visible = ordered[start:start + page_size]
+
+    mins, maxs = source.ranges(visible, source.columns(shown_props))
+    data = {"Composite": source.names_at(visible)}
+    for k, prop in enumerate(shown_props):
+        data[f"{prop} min"] = mins[:, k]
+        data[f"{prop} max"] = maxs[:, k]
+    df_page = pd.DataFrame(data)
+    styler = df_page.style.format("{:g}", na_rep="N/A", subset=df_page.columns[1:])
+
+    # Tahmini hücreler italik ve renkli gösterilir
+    imputed = imputed_cells(source, visible, shown_props)
+    if imputed.any():
+        css = np.where(np.repeat(imputed, 2, axis=1), "font-style: italic; color: #b26b00", "")
+        styler = styler.apply(
+            lambda _: pd.DataFrame(css, index=df_page.index, columns=df_page.columns[1:]),
+            axis=None, subset=df_page.columns[1:]
+        )
+    st.dataframe(styler, hide_index=True, use_container_width=True)
+    st.caption(
+        f"Showing {start + 1 if len(visible) else 0}–{start + len(visible)} of {len(ordered)} composites"
+        + (" · italic values are imputed estimates" if imputed.any() else "")
+    )
+
+# ---------------------------
+# 🔁 Sekme yalıtımı (fragment)
+# ---------------------------
+# st.tabs gizli sekmeleri de çalıştırır. Sekme 2–5 ve Tab 1'deki tablo / benzerlik araması
+# birer fragment'tır: içlerindeki bir widget yalnızca o bölümü yeniden çalıştırır. Sonraki
+# sekmelerin okuduğu çıktı (ön eleme / filtreleme anahtarı) değiştiyse tüm sayfa bir kez
+# yeniden çalışır; ara sonuçlar aşama önbelleğinden gelir.
+def publish_tab_key(tab, key):
+    """
+    Sekmenin çıktı anahtarını kaydeder; fragment olarak çalışırken anahtar değiştiyse sayfayı yeniden çalıştırır.
+    """
+    outputs = st.session_state.setdefault("tab_outputs", {})
+    previous_run, previous_key = outputs.get(tab, (None, None))
+    outputs[tab] = (st.session_state["page_run"], key)
+    if previous_run == st.session_state["page_run"] and previous_key != key:
+        st.rerun()
+
+# Filtreleme, skorlama ve Pareto sekmelerinde kullanılabilen özellikler
+filterable_props = [
+    "Cost (USD/kg)",
+    "Interfacial Properties with Carbon Fiber (IFSS, MPa)",
+    "Shrinkage (%)",
+    "Tensile Strength (MPa)",
+    "Flexural Modulus (GPa)",
+    "Elongation At Break (%)",
+    "Density (kg/m³)",
+    "Glass Transition Temperature (°C)",
+    "Melting Temperature (°C)",
+    "Processing Temperature (°C)",
+    "Injection Pressure (MPa)"
+]
+
 # ---------------------------
 # 🗂️ Sekmeler
 # ---------------------------
@@ -547,6 +751,57 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
     "💰 Mold Cost Analysis"
 ])
 
+# 📌 Tab 1 kompozit tablosu ve benzerlik araması: sayfalama / arama yalnızca bu bölümü yeniden çalıştırır
+@st.fragment
+def dataset_browser():
+    st.markdown("### **Candidate Composites**")
+    candidate_table(store, np.arange(len(store)), input_key(store.version), "candidates")
+
+    # 🧭 Benzer kompozitler: ikame arayışı için KD-ağacı araması
+    with st.expander("🧭 Find similar composites"):
+        reference_name = st.text_input("Composite name", key="similar_reference").strip()
+        similar_props = st.multiselect(
+            "Properties to compare", properties, default=properties, key="similar_props"
+        )
+        col1, col2 = st.columns(2)
+        n_similar = col1.number_input(
+            "Number of similar composites", min_value=1, max_value=100, value=5, step=1, key="similar_k"
+        )
+        use_weights = col2.checkbox("Weight properties", key="similar_use_weights")
+        similar_weights = [1.0] * len(similar_props)
+        if use_weights and similar_props:
+            weight_cols = st.columns(3)
+            similar_weights = [
+                weight_cols[i % 3].number_input(
+                    prop, min_value=0.0, value=1.0, step=0.5, key=f"similar_weight_{prop}"
+                )
+                for i, prop in enumerate(similar_props)
+            ]
+
+        if reference_name and similar_props:
+            if reference_name not in store:
+                st.warning(f"⚠️ No composite named '{reference_name}' in the database.")
+            else:
+                similarity_index = get_or_compute_derived(
+                    "similarity_index", input_key(store.version, similar_props, similar_weights),
+                    lambda: SimilarityIndex(store, similar_props, similar_weights),
+                    max_entries=4
+                )
+                similar_rows, distances, shares = similarity_index.query(
+                    store.rows([reference_name])[0], k=n_similar
+                )
+                df_similar = pd.DataFrame(
+                    np.round(shares * 100, 1), columns=[f"{prop} (%)" for prop in similar_props]
+                )
+                df_similar.insert(0, "Distance", np.round(distances, 3))
+                df_similar.insert(0, "Composite", store.names_at(similar_rows))
+                st.dataframe(df_similar, hide_index=True, use_container_width=True)
+                st.caption(
+                    "Distance uses normalized range midpoints and widths; the % columns show each "
+                    "property's share of the squared distance. Missing values count as typical values."
+                )
+
+
 # =========================================================
 # TAB 1 — DATASET MANAGEMENT
 # =========================================================
@@ -572,7 +827,7 @@ with tab1:
 
         if st.button("Add composite to dataset"):
             if composite_name and all(isinstance(val, tuple) for val in new_entry.values()):
-                st.session_state.datasets[composite_name] = new_entry
+                store.add(composite_name, new_entry)
                 st.success(f"✅ {composite_name} added successfully.")
 
     # 📥 Excel'den yükleme
@@ -592,152 +847,192 @@ with tab1:
         )
 
         uploaded_file = st.file_uploader("Upload your completed Excel file here", type=["xlsx"])
-        if uploaded_file:
-            df = pd.read_excel(uploaded_file)
-            for idx, row in df.iterrows():
-                name = row["Name"]
-                entry = {}
-                for prop in properties:
-                    entry[prop] = (row[f"{prop} min"], row[f"{prop} max"])
-                st.session_state.datasets[name] = entry
-            st.success("✅ All composites from the Excel file uploaded successfully.")
-
-    # 📌 CANDIDATE COMPOSITES — Tüm kompozitleri yatay tabloda göster
-    if st.session_state.datasets:
-        st.markdown("### **Candidate Composites**")
-        all_data = {}
-        for name, prop_dict in st.session_state.datasets.items():
-            all_data[name] = {}
-            for prop in properties:
-                val = prop_dict.get(prop)
-                if val is None:
-                    all_data[name][prop] = "N/A"
-                elif isinstance(val, tuple):
-                    all_data[name][prop] = f"{val[0]} – {val[1]}"
-                else:
-                    all_data[name][prop] = str(val)
-        df_candidates = pd.DataFrame(all_data)
-        st.dataframe(df_candidates, use_container_width=True)
+        # Aynı dosya yükleyicide kaldıkça her yeniden çalıştırmada tekrar içe aktarma (sürüm artmasın)
+        if uploaded_file and st.session_state.get("imported_excel_id") != uploaded_file.file_id:
+            with st.spinner("Importing Excel file..."):
+                names, mins, maxs, errors = import_excel(uploaded_file, properties)
+            if names:
+                # Yüklenen referans veriler paylaşılan veritabanına yazılır
+                store.rebase(material_db.add_many(names, mins, maxs))
+            st.session_state["imported_excel_id"] = uploaded_file.file_id
+            st.session_state["import_result"] = (len(names), errors)
+
+        # ✅ Son içe aktarımın özeti ve doğrulama raporu
+        if uploaded_file and "import_result" in st.session_state:
+            n_imported, errors = st.session_state["import_result"]
+            if not errors:
+                st.success(f"✅ All {n_imported} composites from the Excel file uploaded successfully.")
+            else:
+                st.warning(f"⚠️ {n_imported} composites imported, {len(errors)} problems found. Invalid cells were imported as N/A.")
+                df_errors = pd.DataFrame(errors)
+                st.dataframe(df_errors.head(100), use_container_width=True)
+                st.download_button(
+                    label="📥 Download validation report",
+                    data=df_errors.to_csv(index=False).encode("utf-8"),
+                    file_name="import_validation_report.csv",
+                    mime="text/csv"
+                )
+
+    # 📌 CANDIDATE COMPOSITES — Tüm kompozitler, sayfa sayfa
+    if len(store):
+        dataset_browser()
+
+        # 🧩 Eksik değer doldurma: ön eleme, filtreleme, skorlama ve maliyet sekmeleri doldurulmuş kopyayı kullanır
+        with st.expander("🧩 Fill missing property values (imputation)"):
+            impute_enabled = st.checkbox(
+                "Use imputed values in Pre-Screening, Filtering, Scoring and Mold Cost tabs", key="impute_enabled"
+            )
+            col1, col2 = st.columns(2)
+            impute_method = col1.selectbox(
+                "Method",
+                IMPUTATION_METHODS,
+                format_func={
+                    "knn": "Nearest neighbours",
+                    "regression": "Regression on correlated properties"
+                }.get,
+                key="impute_method"
+            )
+            col2.number_input(
+                "Neighbours", min_value=1, max_value=50, value=5, step=1, key="impute_k",
+                disabled=impute_method != "knn"
+            )
+            if impute_enabled:
+                filled = imputed_view(store)
+                raw_mins, raw_maxs = store.ranges()
+                df_imputed = pd.DataFrame({
+                    "Property": properties,
+                    "Missing cells": (np.isnan(raw_mins) | np.isnan(raw_maxs)).sum(axis=0),
+                    "Imputed cells": filled.imputed.sum(axis=0)
+                })
+                st.dataframe(df_imputed[df_imputed["Missing cells"] > 0], hide_index=True, use_container_width=True)
+                st.caption(
+                    "Imputed values are estimates from composites with similar properties. They are shown in "
+                    "italics in later tables and listed next to filtering and ranking results."
+                )
 
 # =========================================================
 # TAB 2 — PRE-SCREENING
 # =========================================================
-with tab2:
+@st.fragment
+def prescreening_tab():
+    store = analysis_store()
+
+    # 📋 Kural tanımları (oturum boyunca düzenlenebilir)
+    if "prescreening_rules" not in st.session_state:
+        st.session_state.prescreening_rules = copy.deepcopy(DEFAULT_RULES)
+    rules = st.session_state.prescreening_rules
+
     # 📄 Ön Eleme Kriterleri Bilgilendirme Yazısı
     st.markdown("### 📌 Pre-Screening Criteria")
-    st.markdown("""
-    1. The **CTE of the composite** must be compatible with the **CTE of CFRP epoxy** with a **maximum variation of 60%**.  
-    2. The **cost of the composite** must be **at least 30% lower than the cost of Invar** in terms of **euro/m³**.  
-    3. The **composite must not undergo plastic deformation** under **autoclave conditions (180°C and 7 bar)**.
-    """)
-
-    # --- Sabitler ---
-    epoxy_cte = 50  # µstrain/°C
-    usd_to_eur = 0.91
-    invar_cost_usd_per_kg = 70
-    invar_density = 8000
-    invar_cost_eur_per_m3 = invar_cost_usd_per_kg * invar_density * usd_to_eur
-    threshold_cost = invar_cost_eur_per_m3 * 0.70  # %30 daha düşük olması gerekir
-
-    passed_composites = []
-
-    for name, props in st.session_state.datasets.items():
-        # --- 1. KRİTER: CTE uyumu ---
-        cte_range = props.get("Coefficient of Thermal Expansion (CTE) (µstrain/°C)")
-        if not isinstance(cte_range, tuple):
-            continue
-        avg_cte = sum(cte_range) / 2
-        cte_lower = epoxy_cte * (1 - 0.6)
-        cte_upper = epoxy_cte * (1 + 0.6)
-        if not (cte_lower <= avg_cte <= cte_upper):
-            continue
-
-        # --- 2. KRİTER: Cost < Invar %30 ---
-        cost_range = props.get("Cost (USD/kg)")
-        density_range = props.get("Density (kg/m³)")
-        if not isinstance(cost_range, tuple) or not isinstance(density_range, tuple):
-            continue
-        avg_cost = sum(cost_range) / 2
-        avg_density = sum(density_range) / 2
-        cost_eur_per_m3 = avg_cost * avg_density * usd_to_eur
-        if cost_eur_per_m3 > threshold_cost:
-            continue
-
-        # --- 3. KRİTER: Otoklav deformasyon testi (N/A toleranslı kural) ---
-        hdt_a = props.get("Heat Deflection Temperature A (1.8 MPa) (°C)")
-        hdt_b = props.get("Heat Deflection Temperature B (0.46 MPa) (°C)")
-
-        avg_hdt_a = None
-        avg_hdt_b = None
-        if isinstance(hdt_a, tuple):
-            avg_hdt_a = sum(hdt_a) / 2
-        if isinstance(hdt_b, tuple):
-            avg_hdt_b = sum(hdt_b) / 2
-
-        def passes_hdt_rule(avg_hdt_a, avg_hdt_b, min_required=180.0):
-            # 1) Eğer A mevcut ve yeterince yüksekse → geçer
-            if avg_hdt_a is not None and avg_hdt_a >= min_required:
-                return True
-            # 2) Eğer sadece B mevcutsa ve yeterince yüksekse → geçer
-            if avg_hdt_b is not None and avg_hdt_b >= min_required:
-                return True
-            # 3) İkisi de varsa interpolasyon uygula
-            if (avg_hdt_a is not None) and (avg_hdt_b is not None):
-                interpolated_temp = avg_hdt_b + ((0.7 - 0.46) / (1.8 - 0.46)) * (avg_hdt_a - avg_hdt_b)
-                return interpolated_temp >= min_required
-            # 4) Veriler yetersiz → kalır
-            return False
-
-        if not passes_hdt_rule(avg_hdt_a, avg_hdt_b, min_required=180.0):
-            continue
-
-        # 🎯 Tüm kriterlerden geçti
-        passed_composites.append(name)
+    st.markdown("\n".join(f"{i}. {describe_rule(rule)}  " for i, rule in enumerate(rules, 1)))
+
+    with st.expander("✏️ Edit pre-screening thresholds"):
+        for i, rule in enumerate(rules):
+            st.markdown(f"**{rule['criterion']}**")
+            params = EDITABLE_PARAMS[rule["type"]]
+            for col, (param, label) in zip(st.columns(len(params)), params):
+                with col:
+                    rule[param] = st.number_input(label, value=float(rule[param]), format="%g", key=f"rule_{i}_{param}")
+
+    screening_mode = st.radio(
+        "Screening mode",
+        ["Midpoint of ranges", "Probabilistic (sample within ranges)"],
+        horizontal=True,
+        key="screening_mode"
+    )
+
+    if screening_mode == "Midpoint of ranges":
+        # 🎯 Tüm kurallar tek geçişte: satır × kriter geçti/kaldı matrisi
+        prescreening_key = input_key(store.version, rules)
+        criteria, pass_matrix = cache.get_or_compute(
+            "prescreening", prescreening_key,
+            lambda: evaluate_rules(rules, store)
+        )
+        passed_rows = np.flatnonzero(pass_matrix.all(axis=1))
+        pass_probability = None
+        matrix_criteria = criteria
+    else:
+        # 🎲 Aralık içinde örnekleme: her kriter ve tümü için geçme olasılığı
+        col1, col2 = st.columns(2)
+        with col1:
+            n_samples = st.number_input(
+                "Samples per composite", min_value=100, max_value=10000, value=1000, step=100,
+                key="screening_samples"
+            )
+        with col2:
+            min_probability = st.slider(
+                "Min. probability of passing all criteria (%)", 1, 100, 50, key="screening_min_probability"
+            )
+        probability_key = input_key(store.version, rules, n_samples)
+        criteria, criterion_probability, pass_probability = cache.get_or_compute(
+            "prescreening_probability", probability_key,
+            lambda: pass_probabilities(rules, store, n_samples=n_samples, seed=0)
+        )
+        # Geçme kuralı P(tümü) ≥ eşik: kriterler tek tek geçilse de birlikte kalınabilir,
+        # bu yüzden matrise ortak kriter de bir kolon olarak eklenir
+        passes_all = pass_probability >= min_probability / 100
+        pass_matrix = np.column_stack([criterion_probability >= min_probability / 100, passes_all])
+        matrix_criteria = criteria + ["All criteria (joint)"]
+        passed_rows = np.flatnonzero(passes_all)
+        prescreening_key = input_key(probability_key, min_probability)
 
     st.markdown("---")
     st.markdown("### ✅ **Pre-Screening Passed Composites**")
 
-    if passed_composites:
-        st.success(f"{len(passed_composites)} composites passed all three criteria:")
-        st.markdown("**" + ", ".join(passed_composites) + "**")
+    if len(passed_rows):
+        st.success(f"{len(passed_rows)} composites passed all {len(criteria)} criteria:")
+        st.markdown("**" + name_summary(store, passed_rows) + "**")
 
         # 📊 Geçenleri tabloda göster
-        filtered_data = {}
-        for name in passed_composites:
-            filtered_data[name] = {}
-            for prop in properties:
-                val = st.session_state.datasets[name].get(prop)
-                if val is None:
-                    filtered_data[name][prop] = "N/A"
-                elif isinstance(val, tuple):
-                    filtered_data[name][prop] = f"{val[0]} – {val[1]}"
-                else:
-                    filtered_data[name][prop] = str(val)
-        df_passed = pd.DataFrame(filtered_data)
-        st.dataframe(df_passed, use_container_width=True)
+        candidate_table(store, passed_rows, prescreening_key, "passed")
     else:
-        st.warning("❌ No composites passed all three pre-screening criteria.")
+        st.warning(f"❌ No composites passed all {len(criteria)} pre-screening criteria.")
+
+    # 🔍 Elenme nedenleri (yeniden hesaplama yok, matristen okunur; olasılık modunda son kolon P(tümü))
+    rejected_rows = np.flatnonzero(~pass_matrix.all(axis=1))
+    if len(rejected_rows):
+        with st.expander(f"🔍 Why were {len(rejected_rows)} composites rejected?"):
+            if pass_probability is None:
+                df_rejected = pd.DataFrame(
+                    np.where(pass_matrix[rejected_rows], "✅", "❌"),
+                    index=store.names_at(rejected_rows),
+                    columns=criteria
+                )
+            else:
+                df_rejected = pd.DataFrame(
+                    np.round(criterion_probability[rejected_rows] * 100, 1),
+                    index=store.names_at(rejected_rows),
+                    columns=[f"P({criterion}) (%)" for criterion in criteria]
+                )
+                df_rejected["P(all) (%)"] = np.round(pass_probability[rejected_rows] * 100, 1)
+            st.dataframe(df_rejected, use_container_width=True)
+
+    if pass_probability is not None and len(passed_rows):
+        with st.expander("🎲 Pass probabilities of passed composites"):
+            df_probability = pd.DataFrame(
+                np.round(criterion_probability[passed_rows] * 100, 1),
+                index=store.names_at(passed_rows),
+                columns=[f"P({criterion}) (%)" for criterion in criteria]
+            )
+            df_probability["P(all) (%)"] = np.round(pass_probability[passed_rows] * 100, 1)
+            st.dataframe(df_probability.sort_values("P(all) (%)", ascending=False), use_container_width=True)
 
     # Sonraki sekmelerin kullanabilmesi için sakla
-    st.session_state["passed_composites"] = passed_composites
-    
+    st.session_state["passed_rows"] = passed_rows
+    st.session_state["prescreening_matrix"] = (matrix_criteria, pass_matrix)
+    st.session_state["prescreening_key"] = prescreening_key
+    publish_tab_key("prescreening", prescreening_key)
+
+
+with tab2:
+    prescreening_tab()
+
 # =========================================================
 # TAB 3 — FILTERING
 # =========================================================
-with tab3:
-    filterable_props = [
-        "Cost (USD/kg)",
-        "Interfacial Properties with Carbon Fiber (IFSS, MPa)",
-        "Shrinkage (%)",
-        "Tensile Strength (MPa)",
-        "Flexural Modulus (GPa)",
-        "Elongation At Break (%)",
-        "Density (kg/m³)",
-        "Glass Transition Temperature (°C)",
-        "Melting Temperature (°C)",
-        "Processing Temperature (°C)",
-        "Injection Pressure (MPa)"
-    ]
+@st.fragment
+def filtering_tab():
+    store = analysis_store()
 
     st.markdown("### 🔎 Property-Based Filtering")
     selected_filters = {}
@@ -756,176 +1051,555 @@ with tab3:
             selected_filters[prop] = (condition, value)
 
     # 🎯 Filtreleri geçenleri belirle (sadece pre-screening'i geçenler)
-    filtered_composites = []
-    base_pool = st.session_state.get("passed_composites", [])
-
-    for name in base_pool:
-        props = st.session_state.datasets[name]
-        match = True
-        for prop, (condition, user_val) in selected_filters.items():
-            value_range = props.get(prop)
-            if not isinstance(value_range, tuple):
-                match = False
-                break
-            min_val, max_val = value_range
-            if condition == "smaller than":
-                if min_val > user_val:
-                    match = False
-                    break
-            elif condition == "larger than":
-                if max_val < user_val:
-                    match = False
-                    break
-            elif condition == "equal to":
-                if not (min_val <= user_val <= max_val):
-                    match = False
-                    break
-        if match:
-            filtered_composites.append(name)
-
-    final_filtered_composites = filtered_composites
+    base_rows = st.session_state.get("passed_rows", np.empty(0, dtype=np.intp))
+
+    # Aralık indeksi veri seti değişmedikçe yeniden kurulmaz
+    interval_index = get_or_compute_derived(
+        "interval_index", input_key(store.version),
+        lambda: PropertyIntervalIndex(store, filterable_props)
+    )
+
+    # Her filtre → ikili arama ile aday bitset'i, filtreler bitset kesişimi ile birleşir
+    filtering_key = input_key(st.session_state.get("prescreening_key"), selected_filters)
+    final_filtered_rows = cache.get_or_compute(
+        "filtering", filtering_key,
+        lambda: bitset_to_rows(
+            interval_index.filter(selected_filters, rows_to_bitset(base_rows, len(store))),
+            len(store)
+        )
+    )
 
     st.markdown("---")
     st.markdown("### ✅ **Filtering Passed Composites**")
-    if final_filtered_composites:
-        st.success(f"{len(final_filtered_composites)} composites matched all selected filter conditions:")
-        st.markdown("**" + ", ".join(final_filtered_composites) + "**")
+    if len(final_filtered_rows):
+        st.success(f"{len(final_filtered_rows)} composites matched all selected filter conditions:")
+        st.markdown("**" + name_summary(store, final_filtered_rows) + "**")
+        filter_imputed = imputed_cells(store, final_filtered_rows, list(selected_filters)).any(axis=1)
+        if filter_imputed.any():
+            st.caption(
+                f"ℹ️ {int(filter_imputed.sum())} of these matched using imputed values: "
+                + name_summary(store, final_filtered_rows[filter_imputed])
+            )
     else:
         st.warning("❌ No composites matched the filtering criteria.")
 
     # Skor ve Maliyet sekmeleri için sakla
     st.session_state["selected_filters"] = selected_filters
-    st.session_state["final_filtered_composites"] = final_filtered_composites
+    st.session_state["final_filtered_rows"] = final_filtered_rows
+    st.session_state["filtering_key"] = filtering_key
+
+    publish_tab_key("filtering", filtering_key)
+
+
+with tab3:
+    filtering_tab()
 
 # =========================================================
 # TAB 4 — WEIGHTED SCORING
 # =========================================================
-with tab4:
+@st.fragment
+def scoring_tab():
+    store = analysis_store()
+
     selected_filters = st.session_state.get("selected_filters", {})
-    final_filtered_composites = st.session_state.get("final_filtered_composites", [])
-
-    if selected_filters and final_filtered_composites:
-        st.subheader("⚖️ Set importance (weight) for each selected property")
-        weights = {}
-        total_weight = 0
-
-        for prop in selected_filters.keys():
-            weight = st.number_input(
-                f"Weight for '{prop}' (0–100)",
-                min_value=0,
-                max_value=100,
-                value=st.session_state.get(f"weight_{prop}", 0),
-                step=1,
-                key=f"weight_{prop}"
-            )
-            weights[prop] = weight
-            total_weight += weight
+    final_filtered_rows = st.session_state.get("final_filtered_rows", np.empty(0, dtype=np.intp))
+
+    if selected_filters and len(final_filtered_rows):
+        ranking_mode = st.radio(
+            "Ranking mode",
+            ["Weighted sum", "Pareto front"],
+            horizontal=True,
+            key="ranking_mode"
+        )
 
-        st.markdown(f"📊 **Total weight: {total_weight}/100**")
+        if ranking_mode == "Pareto front":
+            # 🏔️ Pareto cephesi: ağırlık yok, her özellik için yön seçilir
+            st.subheader("🏔️ Pareto-optimal composites")
+            pareto_props = st.multiselect(
+                "Properties for the Pareto front",
+                filterable_props,
+                default=list(selected_filters.keys()),
+                key="pareto_props"
+            )
+            directions = {}
+            for col, prop in zip(st.columns(max(1, len(pareto_props))), pareto_props):
+                with col:
+                    directions[prop] = st.selectbox(
+                        prop,
+                        ["maximize", "minimize"],
+                        index=1 if prop in MINIMIZED_BY_DEFAULT else 0,
+                        key=f"direction_{prop}"
+                    )
+            n_fronts = st.slider("Number of successive fronts", 1, 5, 1, key="pareto_n_fronts")
+
+            if len(pareto_props) < 2:
+                st.info("ℹ️ Select at least two properties to build a Pareto front.")
+            else:
+                pareto_values = store.midpoints(final_filtered_rows)[:, store.columns(pareto_props)]
+                fronts = cache.get_or_compute(
+                    "pareto", input_key(st.session_state.get("filtering_key"), directions, n_fronts),
+                    lambda: pareto_fronts(
+                        pareto_values,
+                        [directions[prop] == "maximize" for prop in pareto_props],
+                        max_fronts=n_fronts
+                    )
+                )
 
-        if total_weight != 100:
-            st.warning("⚠️ Total weight must be exactly 100 to proceed.")
+                excluded = int(np.isnan(pareto_values).any(axis=1).sum())
+                if excluded:
+                    st.caption(f"{excluded} composites with N/A values in the selected properties were left out.")
+
+                on_front = np.flatnonzero(fronts >= 0)
+                on_front = on_front[np.argsort(fronts[on_front], kind="stable")]
+                df_front = pd.DataFrame(pareto_values[on_front], columns=pareto_props)
+                df_front.insert(0, "Front", fronts[on_front] + 1)
+                df_front.insert(0, "Composite", store.names_at(final_filtered_rows[on_front]))
+                st.success(f"{int((fronts == 0).sum())} composites are Pareto-optimal.")
+                st.dataframe(df_front, hide_index=True, use_container_width=True)
+
+                # 📈 Cephe grafiği (ilk iki özellik eksen, tüm özellikler hover'da)
+                fig = go.Figure()
+                x_prop, y_prop = pareto_props[0], pareto_props[1]
+                for rank in range(n_fronts):
+                    members = df_front[df_front["Front"] == rank + 1].sort_values(x_prop)
+                    if members.empty:
+                        continue
+                    hover_texts = [
+                        f"<b>{row['Composite']}</b><br>" + "<br>".join(f"{prop}: {row[prop]:g}" for prop in pareto_props)
+                        for _, row in members.iterrows()
+                    ]
+                    fig.add_trace(go.Scatter(
+                        name=f"Front {rank + 1}",
+                        x=members[x_prop],
+                        y=members[y_prop],
+                        mode="lines+markers" if len(pareto_props) == 2 else "markers",
+                        line_shape="hv",
+                        hovertext=hover_texts,
+                        hoverinfo="text"
+                    ))
+                fig.update_layout(
+                    xaxis_title=f"{x_prop} ({directions[x_prop]})",
+                    yaxis_title=f"{y_prop} ({directions[y_prop]})",
+                    title="🏔️ Pareto Front",
+                    height=600
+                )
+                st.plotly_chart(fig, use_container_width=True)
         else:
-            def evaluate_score(condition, user_val, min_val, max_val):
-                if user_val is None or min_val is None or max_val is None:
-                    return 0.0
-                if min_val == max_val:
-                    return 1.05 if user_val == min_val else max(0.0, 1 - abs(user_val - min_val) / (abs(min_val) if min_val != 0 else 1))
-                range_val = max_val - min_val
-                center = (min_val + max_val) / 2
-                if condition == "smaller than":
-                    if user_val <= min_val:
-                        return 1.0
-                    elif user_val > max_val:
-                        return max(0.0, 1 - (user_val - max_val) / range_val)
-                    else:
-                        return 1 - (user_val - min_val) / range_val
-                elif condition == "larger than":
-                    if user_val >= max_val:
-                        return 1.0
-                    elif user_val < min_val:
-                        return max(0.0, 1 - (min_val - user_val) / range_val)
-                    else:
-                        return 1 - (max_val - user_val) / range_val
-                elif condition == "equal to":
-                    diff = abs(user_val - center)
-                    normalized = 1 - (diff / range_val)
-                    return 1.05 if diff == 0 else max(0.0, normalized)
-                return 0.0
-
-            # 🔢 Skorları hesapla
-            scores = {}
-            contribution_table = {}
-
-            for name in final_filtered_composites:
-                total_score = 0
-                contribution_table[name] = {}
-
-                for prop, (condition, user_val) in selected_filters.items():
-                    min_val, max_val = st.session_state.datasets[name].get(prop, (None, None))
-                    score = evaluate_score(condition, user_val, min_val, max_val)
-                    weight = weights[prop] / 100
-                    total_score += score * weight
-                    contribution_table[name][prop] = round(score * weight * 100, 2)
-
-                scores[name] = round(total_score * 100, 2)
-
-            # 🏆 Skorları sırala
-            sorted_scores = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-
-            st.subheader("🏆 Ranked Composites by Weighted Scoring")
-            for i, (name, score) in enumerate(sorted_scores, 1):
-                st.write(f"{i}. **{name}** — Score: {score:.2f} / 100")
-
-            # 📊 Stacked bar chart
-            st.subheader("📊 Composite Score Breakdown")
-            fig = go.Figure()
-            sorted_names = [k for k, _ in sorted_scores]
+            st.subheader("⚖️ Set importance (weight) for each selected property")
+            weights = {}
+            total_weight = 0
 
             for prop in selected_filters.keys():
-                y_vals = [contribution_table[name][prop] for name in sorted_names]
-                hover_texts = [
-                    f"{prop}<br>Contribution: {contribution_table[name][prop]}<br>Weight: {weights[prop]}"
-                    for name in sorted_names
+                weight = st.number_input(
+                    f"Weight for '{prop}' (0–100)",
+                    min_value=0,
+                    max_value=100,
+                    value=st.session_state.get(f"weight_{prop}", 0),
+                    step=1,
+                    key=f"weight_{prop}"
+                )
+                weights[prop] = weight
+                total_weight += weight
+
+            st.markdown(f"📊 **Total weight: {total_weight}/100**")
+
+            if total_weight != 100:
+                st.warning("⚠️ Total weight must be exactly 100 to proceed.")
+            else:
+                # 🔢 Özellik başına skor kolonu: ön elemeyi geçen tüm satırlar için, yalnızca
+                # (özellik, koşul, değer) ile anahtarlanır → tek filtre değişince tek kolon yeniden hesaplanır
+                filter_props = list(selected_filters.keys())
+                base_rows = st.session_state.get("passed_rows", np.empty(0, dtype=np.intp))
+
+                def score_column(prop, condition, user_val):
+                    mins, maxs = store.ranges(base_rows, store.columns([prop]))
+                    return score_matrix(mins, maxs, condition_codes([condition]), [user_val])[:, 0]
+
+                columns = [
+                    cache.get_or_compute(
+                        "score_column",
+                        input_key(st.session_state.get("prescreening_key"), prop, condition, user_val),
+                        lambda: score_column(prop, condition, user_val),
+                        max_entries=2 * len(filterable_props)
+                    )
+                    for prop, (condition, user_val) in selected_filters.items()
                 ]
-                fig.add_trace(go.Bar(
-                    name=prop,
-                    x=sorted_names,
-                    y=y_vals,
-                    hovertext=hover_texts,
-                    hoverinfo="text"
-                ))
-
-            fig.update_layout(
-                barmode='stack',
-                xaxis_title="Composite",
-                yaxis_title="Total Score (out of 100)",
-                title="📊 Composite Score Breakdown",
-                height=600
-            )
-            st.plotly_chart(fig, use_container_width=True)
+                # Filtrelenmiş satırlar ön eleme satırlarının alt kümesi (ikisi de sıralı)
+                positions = np.searchsorted(base_rows, final_filtered_rows)
+                score_mat = np.column_stack([column[positions] for column in columns])
+
+                # Ağırlık değişimi: tek matris-vektör çarpımı + yeniden sıralama
+                weight_vector = [weights[prop] for prop in filter_props]
+                scoring_key = input_key(st.session_state.get("filtering_key"), weights)
+                scores = cache.get_or_compute(
+                    "scoring", scoring_key, lambda: np.round(weighted_scores(score_mat, weight_vector), 2)
+                )
+
+                # 🏆 Yalnızca ilk N sıralanır (kısmi seçim)
+                top_n = st.number_input(
+                    "Number of top composites to show",
+                    min_value=1,
+                    max_value=len(final_filtered_rows),
+                    value=min(len(final_filtered_rows), 25),
+                    step=1,
+                    key="top_n"
+                )
+                ranked = top_k(scores, top_n)
+                sorted_names = store.names_at(final_filtered_rows[ranked])
+                contributions = np.round(score_contributions(score_mat, weight_vector, ranked), 2)
+
+                st.subheader("🏆 Ranked Composites by Weighted Scoring")
+                ranked_imputed = imputed_cells(store, final_filtered_rows[ranked], filter_props)
+                for i, (name, score, flags) in enumerate(zip(sorted_names, scores[ranked], ranked_imputed), 1):
+                    note = ", ".join(prop for prop, flag in zip(filter_props, flags) if flag)
+                    st.write(f"{i}. **{name}** — Score: {score:.2f} / 100" + (f" _(imputed: {note})_" if note else ""))
+
+                # 📊 Stacked bar chart
+                st.subheader("📊 Composite Score Breakdown")
+                fig = go.Figure()
+
+                for j, prop in enumerate(filter_props):
+                    y_vals = contributions[:, j]
+                    hover_texts = [
+                        f"{prop}<br>Contribution: {contribution}<br>Weight: {weights[prop]}"
+                        for contribution in y_vals
+                    ]
+                    fig.add_trace(go.Bar(
+                        name=prop,
+                        x=sorted_names,
+                        y=y_vals,
+                        hovertext=hover_texts,
+                        hoverinfo="text"
+                    ))
+
+                fig.update_layout(
+                    barmode='stack',
+                    xaxis_title="Composite",
+                    yaxis_title="Total Score (out of 100)",
+                    title="📊 Composite Score Breakdown",
+                    height=600
+                )
+                st.plotly_chart(fig, use_container_width=True)
+
+                # 🎲 Ağırlık duyarlılığı: örneklenen ağırlıklarla sıralama ne kadar kararlı?
+                with st.expander("🎲 Weight sensitivity (Monte Carlo)"):
+                    col1, col2, col3 = st.columns(3)
+                    with col1:
+                        sampling_mode = st.selectbox(
+                            "Weight sampling",
+                            ["Dirichlet around my weights", "Uniform on the simplex"],
+                            key="mc_mode"
+                        )
+                    with col2:
+                        n_samples = st.number_input(
+                            "Number of samples", min_value=100, max_value=50000, value=10000, step=100, key="mc_samples"
+                        )
+                    with col3:
+                        concentration = st.number_input(
+                            "Concentration (higher = closer to my weights)",
+                            min_value=1.0, max_value=1000.0, value=50.0, step=5.0, key="mc_concentration",
+                            disabled=sampling_mode != "Dirichlet around my weights"
+                        )
+
+                    if st.checkbox("Run sensitivity analysis", key="mc_run"):
+                        base_weights = [weights[prop] for prop in filter_props]
+                        mode = "uniform" if sampling_mode == "Uniform on the simplex" else "dirichlet"
+                        stability = cache.get_or_compute(
+                            "sensitivity",
+                            input_key(scoring_key, mode, n_samples, concentration, top_n),
+                            lambda: rank_stability(
+                                score_mat,
+                                sample_weights(base_weights, n_samples, mode=mode, concentration=concentration, seed=0),
+                                base_weights,
+                                top=top_n
+                            )
+                        )
+
+                        # Tablo en fazla STABILITY_MAX_ROWS, ısı haritası / çiftler STABILITY_MAX_PAIRS aday
+                        top_rows = stability["rows"]
+                        top_names = store.names_at(final_filtered_rows[top_rows])
+                        p5, p50, p95 = stability["rank_percentiles"] + 1
+                        n_pairs = len(stability["reversal"])
+                        pair_names = top_names[:n_pairs]
+                        st.markdown("#### 📋 Rank stability")
+                        if len(top_rows) < top_n:
+                            st.caption(f"Showing the top {len(top_rows)} composites.")
+                        st.dataframe(pd.DataFrame({
+                            "Composite": top_names,
+                            "Rank (my weights)": np.arange(1, len(top_rows) + 1),
+                            "P(#1) (%)": np.round(stability["p_first"][top_rows] * 100, 1),
+                            "Mean rank": np.round(stability["mean_rank"][top_rows] + 1, 2),
+                            "Rank 5–95%": [f"{lo:g} – {hi:g}" for lo, hi in zip(p5, p95)],
+                            "Median rank": p50
+                        }), hide_index=True, use_container_width=True)
+
+                        # Sıra dağılımı ısı haritası
+                        rank_labels = [str(r) for r in range(1, n_pairs + 1)] + [f">{n_pairs}"]
+                        fig_ranks = go.Figure(go.Heatmap(
+                            z=stability["rank_distribution"] * 100,
+                            x=rank_labels,
+                            y=pair_names,
+                            colorscale="Viridis",
+                            colorbar=dict(title="%")
+                        ))
+                        fig_ranks.update_layout(
+                            xaxis_title="Rank",
+                            yaxis_title="Composite",
+                            yaxis_autorange="reversed",
+                            title="🎲 Rank Distribution",
+                            height=max(400, 25 * n_pairs)
+                        )
+                        st.plotly_chart(fig_ranks, use_container_width=True)
+
+                        # Sıra değişimi çiftleri: üstteki kompozitin alttakinin gerisine düşme olasılığı
+                        upper, lower = np.triu_indices(n_pairs, k=1)
+                        reversal = stability["reversal"][upper, lower]
+                        shown = np.argsort(-reversal, kind="stable")[:20]
+                        shown = shown[reversal[shown] > 0]
+                        st.markdown("#### 🔁 Most likely rank reversals")
+                        if len(shown):
+                            st.dataframe(pd.DataFrame({
+                                "Ranked higher": [pair_names[i] for i in upper[shown]],
+                                "Ranked lower": [pair_names[j] for j in lower[shown]],
+                                "P(reversed) (%)": np.round(reversal[shown] * 100, 1)
+                            }), hide_index=True, use_container_width=True)
+                        else:
+                            st.info("ℹ️ No rank reversals among the top composites.")
     else:
-        st.info("ℹ️ Please complete Pre-Screening and Filtering tabs first, then set weights here.")
+        st.info("ℹ️ Please complete Pre-Screening and Filtering tabs first, then set weights or a Pareto front here.")
+
+    # ---------------------------
+    # 🗂️ Senaryo karşılaştırması: kayıtlı filtre / ağırlık setleri tek geçişte değerlendirilir
+    # ---------------------------
+    scenario_rows = st.session_state.get("passed_rows", np.empty(0, dtype=np.intp))
+    if len(scenario_rows):
+        with st.expander("🗂️ Scenario comparison"):
+            scenarios = st.session_state.setdefault("scenarios", {})
+            current_weights = {prop: st.session_state.get(f"weight_{prop}", 0) for prop in selected_filters}
+
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                scenario_name = st.text_input("Scenario name", key="scenario_name")
+            with col2:
+                save_scenario = st.button("💾 Save current filters & weights", key="save_scenario")
+            if save_scenario:
+                if not scenario_name.strip():
+                    st.warning("⚠️ Please enter a scenario name.")
+                elif not selected_filters:
+                    st.warning("⚠️ Select at least one filter in the Filtering tab first.")
+                elif sum(current_weights.values()) != 100:
+                    st.warning("⚠️ Total weight must be exactly 100 to save a scenario.")
+                else:
+                    scenarios[scenario_name.strip()] = {
+                        "filters": {prop: [condition, float(value)] for prop, (condition, value) in selected_filters.items()},
+                        "weights": current_weights
+                    }
+                    st.success(f"✅ Scenario '{scenario_name.strip()}' saved.")
+
+            scenario_file = st.file_uploader("📤 Import scenarios (JSON)", type=["json"], key="scenario_upload")
+            if scenario_file and st.session_state.get("imported_scenarios_id") != scenario_file.file_id:
+                st.session_state["imported_scenarios_id"] = scenario_file.file_id
+                try:
+                    imported = json.load(scenario_file)
+                    for name, scenario in imported.items():
+                        # Hatalı bir senaryo yalnızca kendisini düşürür; dosyanın geri kalanı okunur
+                        try:
+                            filters = {
+                                prop: [condition, float(value)]
+                                for prop, (condition, value) in scenario["filters"].items()
+                                if prop in filterable_props
+                            }
+                            scenario_weights = {prop: float(scenario["weights"].get(prop, 0)) for prop in filters}
+                        except (ValueError, KeyError, TypeError, AttributeError) as e:
+                            st.warning(f"⚠️ Scenario '{name}' skipped: invalid value ({e}).")
+                            continue
+                        # Bilinmeyen koşul skorlamada sessizce yok sayılırdı (kod -1)
+                        unknown_conditions = sorted({
+                            str(condition) for condition, _ in filters.values() if condition not in CONDITION_CODES
+                        })
+                        if unknown_conditions:
+                            st.warning(
+                                f"⚠️ Scenario '{name}' skipped: unknown condition(s) {', '.join(unknown_conditions)}; "
+                                f"use one of {', '.join(CONDITION_CODES)}."
+                            )
+                        elif filters and np.isclose(sum(scenario_weights.values()), 100):
+                            scenarios[name] = {"filters": filters, "weights": scenario_weights}
+                        else:
+                            st.warning(f"⚠️ Scenario '{name}' skipped: unknown properties or weights not summing to 100.")
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    st.error(f"❌ Could not read scenario file: {e}")
+
+            if scenarios:
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    removed = st.multiselect("Remove scenarios", list(scenarios), key="scenario_remove")
+                with col2:
+                    if st.button("🗑️ Remove", key="scenario_remove_button") and removed:
+                        for name in removed:
+                            scenarios.pop(name, None)
+                        st.rerun()
+
+                st.download_button(
+                    "📥 Export scenarios (JSON)",
+                    json.dumps(scenarios, indent=2, ensure_ascii=False),
+                    file_name="scenarios.json",
+                    mime="application/json"
+                )
+
+                # Tüm senaryolar tek çağrıda: (senaryo, özellik) çiftleri tek skor matrisine açılır
+                def evaluate_scenarios():
+                    scenario_names = list(scenarios)
+                    used_props = [p for p in filterable_props if any(p in sc["filters"] for sc in scenarios.values())]
+                    codes = np.full((len(scenario_names), len(used_props)), -1)
+                    values = np.zeros((len(scenario_names), len(used_props)))
+                    scenario_weights = np.zeros((len(scenario_names), len(used_props)))
+                    for s, name in enumerate(scenario_names):
+                        for prop, (condition, value) in scenarios[name]["filters"].items():
+                            j = used_props.index(prop)
+                            codes[s, j] = condition_codes([condition])[0]
+                            values[s, j] = value
+                            scenario_weights[s, j] = scenarios[name]["weights"][prop]
+                    mins, maxs = store.ranges(scenario_rows, store.columns(used_props))
+                    totals, matched = scenario_scores(mins, maxs, codes, values, scenario_weights)
+                    return scenario_names, np.round(totals, 2), matched
+
+                scenario_names, scenario_totals, scenario_matched = cache.get_or_compute(
+                    "scenarios",
+                    input_key(st.session_state.get("prescreening_key"), scenarios),
+                    evaluate_scenarios
+                )
+
+                st.dataframe(pd.DataFrame({
+                    "Scenario": scenario_names,
+                    "Filters": [
+                        ", ".join(f"{prop} {condition} {value:g} (w={scenarios[name]['weights'][prop]})"
+                                  for prop, (condition, value) in scenarios[name]["filters"].items())
+                        for name in scenario_names
+                    ],
+                    "Matching composites": scenario_matched.sum(axis=1)
+                }), hide_index=True, use_container_width=True)
+
+                scenario_top_n = st.number_input(
+                    "Number of top composites per scenario", min_value=1, max_value=100, value=10, step=1,
+                    key="scenario_top_n"
+                )
+                ranking_columns = {}
+                for s, name in enumerate(scenario_names):
+                    matched_rows = np.flatnonzero(scenario_matched[s])
+                    ranked = matched_rows[top_k(scenario_totals[s, matched_rows], scenario_top_n)]
+                    cells = [
+                        f"{composite} ({score:.2f})"
+                        for composite, score in zip(store.names_at(scenario_rows[ranked]), scenario_totals[s, ranked])
+                    ]
+                    ranking_columns[name] = cells + [""] * (scenario_top_n - len(cells))
+                st.markdown("#### 🏆 Side-by-side rankings")
+                st.dataframe(
+                    pd.DataFrame(ranking_columns, index=pd.RangeIndex(1, scenario_top_n + 1, name="Rank")),
+                    use_container_width=True
+                )
+
+
+with tab4:
+    scoring_tab()
 
 # =========================================================
 # TAB 5 — MOLD COST ANALYSIS
 # =========================================================
-with tab5:
-    final_filtered_composites = st.session_state.get("final_filtered_composites", [])
+@st.fragment
+def mold_cost_tab():
+    store = analysis_store()
+
+    final_filtered_rows = st.session_state.get("final_filtered_rows", np.empty(0, dtype=np.intp))
 
     with st.expander("💰 Calculate Mold Production Cost", expanded=True):
-        st.markdown("Upload your STL file below. The volume and dimensions will be extracted automatically.")
-        uploaded_stl = st.file_uploader("📦 Upload STL file", type=["stl"], key="stl_upload")
+        st.markdown(
+            "Upload your STL files below (one part, several parts or a zip of the whole tool set). "
+            "The volume and dimensions will be extracted automatically."
+        )
+        uploaded_stls = st.file_uploader(
+            "📦 Upload STL files", type=["stl", "zip"], accept_multiple_files=True, key="stl_upload"
+        )
 
-        if uploaded_stl and final_filtered_composites:
+        if uploaded_stls and len(final_filtered_rows):
             try:
-                mesh = trimesh.load(uploaded_stl, file_type='stl', force='mesh')
-                volume_mm3 = mesh.volume
-                volume_m3 = volume_mm3 * 1e-9
-                bbox = mesh.bounding_box.extents
-                bbox_mm = [round(x, 2) for x in bbox]
-                
-                st.success("✅ STL file successfully processed.")
+                # 🧩 Yükleme başına bir kez diske alınır; ağ ölçüleri içerik özetine göre saklanır,
+                # yeni parçalar süreç havuzunda paralel ölçülür
+                part_index = st.session_state.setdefault("stl_parts", {})
+                mesh_info = st.session_state.setdefault("mesh_info", {})
+                new_uploads = [f for f in uploaded_stls if f.file_id not in part_index]
+                if new_uploads:
+                    with st.spinner("Processing meshes..."), tempfile.TemporaryDirectory() as workdir:
+                        spooled = spool_parts(new_uploads, workdir)
+                        mesh_info.update(batch_mesh_properties(
+                            {p["digest"]: p["path"] for p in spooled if p["digest"] not in mesh_info}
+                        ))
+                    for k, upload in enumerate(new_uploads):
+                        part_index[upload.file_id] = [
+                            {"name": p["name"], "member": p["member"], "digest": p["digest"]}
+                            for p in spooled if p["upload"] == k
+                        ]
+
+                uploads_by_id = {f.file_id: f for f in uploaded_stls}
+                parts = [dict(part, file_id=f.file_id) for f in uploaded_stls for part in part_index[f.file_id]]
+                for part in parts:
+                    if "error" in mesh_info[part["digest"]]:
+                        st.error(f"❌ Error reading STL file {part['name']}: {mesh_info[part['digest']]['error']}")
+                parts = [part for part in parts if "error" not in mesh_info[part["digest"]]]
+
+                def part_bytes(part):
+                    upload = uploads_by_id[part["file_id"]]
+                    if part["member"] is None:
+                        return upload.getvalue()
+                    with zipfile.ZipFile(upload) as archive:
+                        return archive.read(part["member"])
+
+            except Exception as e:
+                st.error(f"❌ Error reading STL file: {e}")
+                parts = []
+
+            if parts:
+                st.success(f"✅ {len(parts)} STL part(s) successfully processed.")
+
+                # 📋 Parça listesi: adetler düzenlenebilir
+                infos = [mesh_info[part["digest"]] for part in parts]
+                extents = np.array([info["extents"] for info in infos])
+                df_parts = pd.DataFrame({
+                    "Part": [part["name"] for part in parts],
+                    "Volume (m³)": [info["volume_mm3"] * 1e-9 for info in infos],
+                    "Width (mm)": np.round(extents[:, 0], 2),
+                    "Depth (mm)": np.round(extents[:, 1], 2),
+                    "Height (mm)": np.round(extents[:, 2], 2),
+                    "Triangles": [info["triangles"] for info in infos],
+                    "Watertight": [info["watertight"] for info in infos],
+                    "Quantity": 1
+                })
+                edited_parts = st.data_editor(
+                    df_parts,
+                    disabled=[col for col in df_parts.columns if col != "Quantity"],
+                    column_config={
+                        "Volume (m³)": st.column_config.NumberColumn(format="%.8f"),
+                        "Quantity": st.column_config.NumberColumn(min_value=0, step=1)
+                    },
+                    hide_index=True,
+                    use_container_width=True,
+                    key="stl_quantities"
+                )
+                quantities = edited_parts["Quantity"].fillna(0).to_numpy(dtype=float)
+                volumes_m3 = df_parts["Volume (m³)"].to_numpy()
+                if not df_parts["Watertight"].all():
+                    st.warning("⚠️ Some meshes are not watertight; their computed volumes may be inaccurate.")
+
+                # 🔍 Seçilen parçanın ölçüleri ve önizlemesi
+                selected_part = 0
+                if len(parts) > 1:
+                    selected_part = st.selectbox(
+                        "Part to inspect", range(len(parts)),
+                        format_func=lambda k: parts[k]["name"], key="stl_selected_part"
+                    )
+                part = parts[selected_part]
+                volume_m3 = volumes_m3[selected_part]
+                bbox_mm = [round(x, 2) for x in infos[selected_part]["extents"]]
+                st.caption(f"{infos[selected_part]['triangles']:,} triangles · read with {infos[selected_part]['reader']} reader")
 
                 col1, col2, col3 = st.columns(3)
                 col1.metric(label="Width (x)", value=f"{bbox_mm[0]} mm")
@@ -938,80 +1612,131 @@ with tab5:
                     unsafe_allow_html=True
                 )
 
-                # ✅ STL 3D ÖNİZLEME BÖLÜMÜ
+                # ✅ STL 3D ÖNİZLEME BÖLÜMÜ — sunucuda seyreltilmiş, sıkıştırılmış geometri
                 st.markdown("### 🧩 STL Preview (3D)")
-                stl_bytes = uploaded_stl.getvalue()
-                encoded = base64.b64encode(stl_bytes).decode()
-
-                html_string = f"""
-                <html>
-                  <head>
-                    <script src="https://cdn.jsdelivr.net/npm/three@0.112.1/build/three.min.js"></script>
-                    <script src="https://cdn.jsdelivr.net/npm/three@0.112.1/examples/js/controls/OrbitControls.js"></script>
-                    <script src="https://cdn.jsdelivr.net/npm/three@0.112.1/examples/js/loaders/STLLoader.js"></script>
-                  </head>
-                  <body>
-                    <div id="container" style="width:100%; height:500px;"></div>
-                    <script>
-                      var scene = new THREE.Scene();
-                      var camera = new THREE.PerspectiveCamera(75, window.innerWidth/window.innerHeight, 0.1, 1000);
-                      var renderer = new THREE.WebGLRenderer();
-                      renderer.setSize(window.innerWidth, 500);
-                      document.getElementById("container").appendChild(renderer.domElement);
-
-                      var controls = new THREE.OrbitControls(camera, renderer.domElement);
-
-                      var loader = new THREE.STLLoader();
-                      var dataUri = "data:application/octet-stream;base64,{encoded}";
-
-                      loader.load(dataUri, function (geometry) {{
+                preview_budget = st.select_slider(
+                    "Preview detail (triangles)",
+                    options=[10_000, 25_000, 50_000, 100_000],
+                    value=50_000,
+                    key="stl_preview_budget"
+                )
+                # Önizleme hatası (bozuk / hacimsiz mesh) sekmenin geri kalanını düşürmesin
+                try:
+                    preview = cache.get_or_compute(
+                        "mesh_preview", input_key(part["digest"], preview_budget),
+                        lambda: preview_payload(part_bytes(part), preview_budget)
+                    )
+                except Exception as e:
+                    preview = None
+                    st.warning(f"⚠️ Could not build the 3D preview: {e}")
+                if preview is not None:
+                    st.caption(f"Previewing {preview['triangles']:,} of {preview['original_triangles']:,} triangles.")
+
+                    html_string = f"""
+                    <html>
+                      <head>
+                        <script src="https://cdn.jsdelivr.net/npm/three@0.112.1/build/three.min.js"></script>
+                        <script src="https://cdn.jsdelivr.net/npm/three@0.112.1/examples/js/controls/OrbitControls.js"></script>
+                      </head>
+                      <body>
+                        <div id="container" style="width:100%; height:500px;"></div>
+                        <script>
+                          var scene = new THREE.Scene();
+                          var camera = new THREE.PerspectiveCamera(75, window.innerWidth/500, 0.1, 1000);
+                          var renderer = new THREE.WebGLRenderer();
+                          renderer.setSize(window.innerWidth, 500);
+                          document.getElementById("container").appendChild(renderer.domElement);
+
+                          var controls = new THREE.OrbitControls(camera, renderer.domElement);
+
+                          function decode(text) {{
+                              return Uint8Array.from(atob(text), function (c) {{ return c.charCodeAt(0); }}).buffer;
+                          }}
+
+                          // Nicemlenmiş konumlar: offset + q * scale
+                          var quantized = new Uint16Array(decode("{preview['positions']}"));
+                          var offset = {preview['offset']};
+                          var scale = {preview['scale']};
+                          var positions = new Float32Array(quantized.length);
+                          for (var i = 0; i < quantized.length; i++) {{
+                              positions[i] = offset[i % 3] + quantized[i] * scale;
+                          }}
+
+                          var geometry = new THREE.BufferGeometry();
+                          geometry.setAttribute("position", new THREE.BufferAttribute(positions, 3));
+                          geometry.setIndex(new THREE.BufferAttribute(new {preview['index_array']}(decode("{preview['indices']}")), 1));
+                          geometry.computeVertexNormals();
+                          geometry.computeBoundingSphere();
+
                           var material = new THREE.MeshNormalMaterial({{wireframe: false}});
                           var mesh = new THREE.Mesh(geometry, material);
-                          geometry.computeBoundingBox();
-                          var center = new THREE.Vector3();
-                          geometry.boundingBox.getCenter(center);
-                          mesh.position.sub(center);
+                          mesh.position.sub(geometry.boundingSphere.center);
                           scene.add(mesh);
-                          camera.position.z = 100;
-                          animate();
-                      }});
-
-                      function animate() {{
-                          requestAnimationFrame(animate);
-                          controls.update();
-                          renderer.render(scene, camera);
-                      }}
-                    </script>
-                  </body>
-                </html>
-                """
-                components.html(html_string, height=550)
-
-                # Üretim maliyetlerini hesapla
-                results = []
-                for name in final_filtered_composites:
-                    props = st.session_state.datasets[name]
-                    cost_range = props.get("Cost (USD/kg)")
-                    density_range = props.get("Density (kg/m³)")
-
-                    if not isinstance(cost_range, tuple) or not isinstance(density_range, tuple):
-                        continue
 
-                    avg_cost = sum(cost_range) / 2
-                    avg_density = sum(density_range) / 2
-                    mass = volume_m3 * avg_density
-                    total_cost = mass * avg_cost
-
-                    results.append({
-                        "Composite": name,
-                        "Average Density (kg/m³)": round(avg_density, 2),
-                        "Average Cost (USD/kg)": round(avg_cost, 2),
-                        "Estimated Mass (kg)": round(mass, 4),
-                        "Estimated Production Cost (USD)": round(total_cost, 2)
+                          var radius = geometry.boundingSphere.radius;
+                          camera.near = radius / 100;
+                          camera.far = radius * 100;
+                          camera.position.z = radius * 2.5;
+                          camera.updateProjectionMatrix();
+
+                          function animate() {{
+                              requestAnimationFrame(animate);
+                              controls.update();
+                              renderer.render(scene, camera);
+                          }}
+                          animate();
+                        </script>
+                      </body>
+                    </html>
+                    """
+                    components.html(html_string, height=550)
+
+                # Tam çözünürlüklü dosya yalnızca istenirse gönderilir
+                if st.checkbox("Prepare full-resolution STL download", key="stl_full_download"):
+                    st.download_button(
+                        label="📥 Download full-resolution STL",
+                        data=part_bytes(part),
+                        file_name=part["name"],
+                        mime="model/stl"
+                    )
+
+                # Üretim maliyetlerini hesapla: parça × kompozit kütle ve maliyet matrisleri
+                part_names = df_parts["Part"].tolist()
+
+                def compute_mold_costs():
+                    mid = store.midpoints(final_filtered_rows)
+                    avg_cost = mid[:, store.prop_index["Cost (USD/kg)"]]
+                    avg_density = mid[:, store.prop_index["Density (kg/m³)"]]
+                    valid = ~(np.isnan(avg_cost) | np.isnan(avg_density))
+                    names = store.names_at(final_filtered_rows[valid])
+                    mass = (volumes_m3 * quantities)[:, None] * avg_density[valid][None, :]
+                    part_cost = mass * avg_cost[valid][None, :]
+
+                    summary = pd.DataFrame({
+                        "Composite": names,
+                        "Average Density (kg/m³)": np.round(avg_density[valid], 2),
+                        "Average Cost (USD/kg)": np.round(avg_cost[valid], 2),
+                        "Estimated Mass (kg)": np.round(mass.sum(axis=0), 4),
+                        "Estimated Production Cost (USD)": np.round(part_cost.sum(axis=0), 2)
+                    })
+                    breakdown = pd.DataFrame({
+                        "Part": np.repeat(part_names, len(names)),
+                        "Quantity": np.repeat(quantities, len(names)),
+                        "Composite": np.tile(names, len(part_names)),
+                        "Mass (kg)": np.round(mass.ravel(), 4),
+                        "Material Cost (USD)": np.round(part_cost.ravel(), 2)
                     })
+                    matrix = pd.DataFrame(np.round(part_cost, 2), index=part_names, columns=names)
+                    return summary, breakdown, matrix
+
+                results, cost_breakdown, cost_matrix = cache.get_or_compute(
+                    "mold_costs",
+                    input_key(st.session_state.get("filtering_key"), part_names, volumes_m3, quantities),
+                    compute_mold_costs
+                )
 
-                if results:
-                    results_df = pd.DataFrame(results).sort_values(by="Estimated Production Cost (USD)").reset_index(drop=True)
+                if not results.empty:
+                    results_df = results.sort_values(by="Estimated Production Cost (USD)").reset_index(drop=True)
                     st.markdown("### 💸 Estimated Mold Production Cost per Composite")
 
                     styled_df = results_df.style\
@@ -1039,10 +1764,35 @@ with tab5:
                         }])
 
                     st.dataframe(styled_df, use_container_width=True, height=400)
+
+                    # 🧮 Parça × kompozit maliyet matrisi
+                    if len(parts) > 1:
+                        st.markdown("### 🧮 Material Cost per Part and Composite (USD)")
+                        st.dataframe(cost_matrix, use_container_width=True)
+                    st.download_button(
+                        label="📥 Download cost breakdown (CSV)",
+                        data=cost_breakdown.to_csv(index=False).encode("utf-8"),
+                        file_name="mold_cost_breakdown.csv",
+                        mime="text/csv"
+                    )
                 else:
                     st.info("ℹ️ No valid composites to estimate cost. Please complete previous steps.")
-
-            except Exception as e:
-                st.error(f"❌ Error reading STL file: {e}")
         else:
-            st.info("ℹ️ Please select composites in Filtering tab and upload an STL file to see cost analysis.")
+            st.info("ℹ️ Please select composites in Filtering tab and upload STL files to see cost analysis.")
+
+
+with tab5:
+    mold_cost_tab()
+
+# ---------------------------
+# 🗄️ Önbellek istatistikleri
+# ---------------------------
+with st.sidebar.expander("🗄️ Pipeline cache"):
+    st.caption(f"Dataset version: {store.version}")
+    cache_stats = cache.stats() + [
+        {**row, "Stage": f"{row['Stage']} (shared)"} for row in shared_cache.stats()
+    ]
+    if cache_stats:
+        st.dataframe(pd.DataFrame(cache_stats), hide_index=True, use_container_width=True)
+    if st.button("Clear cache", key="clear_pipeline_cache"):
+        cache.clear()
@@ -0,0 +1,56 @@
+# pareto.py
+import numpy as np
+
+# Varsayılan olarak küçültülmesi istenen özellikler (diğerleri büyütülür)
+MINIMIZED_BY_DEFAULT = {
+    "Coefficient of Thermal Expansion (CTE) (µstrain/°C)",
+    "Cost (USD/kg)",
+    "Shrinkage (%)",
+    "Density (kg/m³)",
+    "Processing Temperature (°C)",
+    "Injection Pressure (MPa)"
+}
+
+
+# ---------------------------
+# 🏔️ Skyline (Pareto) seçimi — Sort-Filter-Skyline
+# ---------------------------
+def _skyline(values):
+    """
+    values: (n, d), tüm yönler minimize. Baskın olmayan satırların indekslerini döndürür.
+    Satırlar toplam değere göre sıralanır: kalanlar içinde en küçük toplamlı satırı
+    hiçbir satır baskılayamaz. O satır cepheye eklenir ve baskıladığı tüm satırlar tek
+    bir vektörel karşılaştırma ile elenir; döngü cephe boyu kadar döner.
+    """
+    order = np.argsort(values.sum(axis=1), kind="stable")
+    remaining = values[order]
+    idx = order
+    front = []
+    while len(idx):
+        point = remaining[0]
+        front.append(idx[0])
+        dominated = np.all(remaining >= point, axis=1) & np.any(remaining > point, axis=1)
+        dominated[0] = True
+        remaining, idx = remaining[~dominated], idx[~dominated]
+    return np.array(front, dtype=np.intp)
+
+
+def pareto_fronts(values, maximize, max_fronts=1):
+    """
+    values: (n, d) özellik değerleri, maximize: (d,) bool yön.
+    Geri dönüş: (n,) cephe numarası (0 = Pareto-optimal), atanmamış / eksik veri → -1.
+    Ardışık cepheler, önceki cepheler çıkarılarak elde edilir.
+    """
+    values = np.asarray(values, dtype=float)
+    signs = np.where(np.asarray(maximize, dtype=bool), -1.0, 1.0)
+    oriented = values * signs
+
+    fronts = np.full(len(values), -1, dtype=int)
+    pool = np.flatnonzero(~np.isnan(oriented).any(axis=1))
+    for rank in range(max_fronts):
+        if not len(pool):
+            break
+        front = pool[_skyline(oriented[pool])]
+        fronts[front] = rank
+        pool = pool[fronts[pool] == -1]
+    return fronts
@@ -0,0 +1,66 @@
+# pipeline_cache.py
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict
+
+
+def input_key(*parts):
+    """
+    Aşama girdilerinden (sürüm, filtreler, ağırlıklar, üst aşama anahtarı...) kararlı bir özet üretir.
+    """
+    return hashlib.sha1(pickle.dumps(parts, protocol=4)).hexdigest()
+
+
+# ---------------------------
+# 🗄️ Aşama önbelleği (LRU): oturum başına veya süreç genelinde paylaşılan
+# ---------------------------
+class PipelineCache:
+    """
+    Her aşama (ön eleme, filtreleme, skorlama, tablolar...) için ayrı bir LRU tutar.
+    Anahtar değişmediyse önceki çıktı yeniden kullanılır; aşama başına en fazla
+    max_entries kayıt saklanır (get_or_compute'ta aşama için ayrıca verilebilir).
+    İsabet / ıskalama sayaçları aşama bazında tutulur. Sözlük işlemleri kilit altındadır
+    (oturumlar arası paylaşılabilir); hesaplama kilit dışında yapılır.
+    """
+
+    def __init__(self, max_entries=8):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = {}
+        self.hits = {}
+        self.misses = {}
+
+    def get_or_compute(self, stage, key, compute, max_entries=None):
+        with self.lock:
+            entries = self.entries.setdefault(stage, OrderedDict())
+            if key in entries:
+                entries.move_to_end(key)
+                self.hits[stage] = self.hits.get(stage, 0) + 1
+                return entries[key]
+            self.misses[stage] = self.misses.get(stage, 0) + 1
+
+        value = compute()
+        with self.lock:
+            entries = self.entries.setdefault(stage, OrderedDict())
+            entries[key] = value
+            while len(entries) > (max_entries or self.max_entries):
+                entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def stats(self):
+        with self.lock:
+            stages = list(self.entries)
+        return [
+            {
+                "Stage": stage,
+                "Hits": self.hits.get(stage, 0),
+                "Misses": self.misses.get(stage, 0),
+                "Entries": len(self.entries.get(stage, ()))
+            }
+            for stage in stages
+        ]
@@ -0,0 +1,197 @@
+# prescreening.py
+import numpy as np
+
+CTE_PROP = "Coefficient of Thermal Expansion (CTE) (µstrain/°C)"
+COST_PROP = "Cost (USD/kg)"
+DENSITY_PROP = "Density (kg/m³)"
+HDT_A_PROP = "Heat Deflection Temperature A (1.8 MPa) (°C)"
+HDT_B_PROP = "Heat Deflection Temperature B (0.46 MPa) (°C)"
+
+# ---------------------------
+# 📋 Varsayılan ön eleme kuralları (proje liderleri eşikleri düzenleyebilir)
+# ---------------------------
+DEFAULT_RULES = [
+    {
+        "criterion": "CTE",
+        "type": "band",
+        "property": CTE_PROP,
+        "reference": "CFRP epoxy",
+        "center": 50.0,      # CFRP epoksi CTE (µstrain/°C)
+        "tolerance": 0.6     # ±%60
+    },
+    {
+        "criterion": "Cost",
+        "type": "cost_ceiling",
+        "cost_property": COST_PROP,
+        "density_property": DENSITY_PROP,
+        "usd_to_eur": 0.91,
+        "reference": "Invar",
+        "reference_cost": 70.0,       # Invar (USD/kg)
+        "reference_density": 8000.0,  # Invar (kg/m³)
+        "max_fraction": 0.70          # Invar'dan en az %30 ucuz
+    },
+    {
+        "criterion": "HDT",
+        "type": "hdt_gate",
+        "property_a": HDT_A_PROP,
+        "pressure_a": 1.8,
+        "property_b": HDT_B_PROP,
+        "pressure_b": 0.46,
+        "pressure": 0.7,          # otoklav basıncı (MPa)
+        "min_required": 180.0     # otoklav sıcaklığı (°C)
+    }
+]
+
+# Kuralların özellik adı taşıyan anahtarları
+PROPERTY_KEYS = ("property", "cost_property", "density_property", "property_a", "property_b")
+
+# Arayüzde düzenlenebilir parametreler: kural tipi → [(anahtar, etiket)]
+EDITABLE_PARAMS = {
+    "band": [
+        ("center", "Reference value"),
+        ("tolerance", "Allowed variation (fraction)")
+    ],
+    "cost_ceiling": [
+        ("reference_cost", "Reference cost (USD/kg)"),
+        ("reference_density", "Reference density (kg/m³)"),
+        ("usd_to_eur", "USD → EUR rate"),
+        ("max_fraction", "Max. cost fraction of reference")
+    ],
+    "hdt_gate": [
+        ("min_required", "Min. temperature (°C)"),
+        ("pressure", "Pressure (MPa)")
+    ]
+}
+
+
+# ---------------------------
+# 🔧 Kural derleyicileri: kural → (ortalama matrisi → bool maske)
+# ---------------------------
+def _compile_band(rule, prop_index):
+    j = prop_index[rule["property"]]
+    lower = rule["center"] * (1 - rule["tolerance"])
+    upper = rule["center"] * (1 + rule["tolerance"])
+
+    def mask(mid):
+        return (lower <= mid[:, j]) & (mid[:, j] <= upper)
+    return mask
+
+
+def _compile_cost_ceiling(rule, prop_index):
+    j_cost = prop_index[rule["cost_property"]]
+    j_density = prop_index[rule["density_property"]]
+    reference_eur_per_m3 = rule["reference_cost"] * rule["reference_density"] * rule["usd_to_eur"]
+    threshold = reference_eur_per_m3 * rule["max_fraction"]
+
+    def mask(mid):
+        return mid[:, j_cost] * mid[:, j_density] * rule["usd_to_eur"] <= threshold
+    return mask
+
+
+def _compile_hdt_gate(rule, prop_index):
+    j_a = prop_index[rule["property_a"]]
+    j_b = prop_index[rule["property_b"]]
+    factor = (rule["pressure"] - rule["pressure_b"]) / (rule["pressure_a"] - rule["pressure_b"])
+    min_required = rule["min_required"]
+
+    def mask(mid):
+        hdt_a, hdt_b = mid[:, j_a], mid[:, j_b]
+        # A veya B tek başına yeterliyse geçer; ikisi de varsa interpolasyon (eksik → NaN → kalır)
+        interpolated = hdt_b + factor * (hdt_a - hdt_b)
+        return (hdt_a >= min_required) | (hdt_b >= min_required) | (interpolated >= min_required)
+    return mask
+
+
+RULE_COMPILERS = {
+    "band": _compile_band,
+    "cost_ceiling": _compile_cost_ceiling,
+    "hdt_gate": _compile_hdt_gate
+}
+
+
+def compile_rules(rules, prop_index):
+    compiled = []
+    for rule in rules:
+        if rule["type"] not in RULE_COMPILERS:
+            raise ValueError(f"Unknown pre-screening rule type: {rule['type']}")
+        compiled.append(RULE_COMPILERS[rule["type"]](rule, prop_index))
+    return compiled
+
+
+def evaluate_rules(rules, store, rows=None):
+    """
+    Kuralları tüm özellik matrisi üzerinde tek geçişte değerlendirir.
+    Geri dönüş: (kriter adları, satır × kriter bool geçti/kaldı matrisi)
+    """
+    mid = store.midpoints(rows)
+    compiled = compile_rules(rules, store.prop_index)
+    criteria = [rule["criterion"] for rule in rules]
+    if not compiled:
+        return criteria, np.ones((len(mid), 0), dtype=bool)
+    return criteria, np.column_stack([mask(mid) for mask in compiled])
+
+
+def rule_properties(rules):
+    props = []
+    for rule in rules:
+        for key in PROPERTY_KEYS:
+            if key in rule and rule[key] not in props:
+                props.append(rule[key])
+    return props
+
+
+# ---------------------------
+# 🎲 Aralık bazlı olasılıksal ön eleme
+# ---------------------------
+def pass_probabilities(rules, store, n_samples=1000, rows=None, seed=None, max_cells=4_000_000):
+    """
+    Ortalama yerine her özellik [min, max] aralığında düzgün dağılımla örneklenir ve
+    kurallar örneklenen değerlere uygulanır. Bellek, satırlar parça parça işlenerek
+    (parça × örnek × özellik ≤ max_cells) sınırlı tutulur.
+    Geri dönüş: (kriter adları, satır × kriter geçme olasılığı, satır başına tümünü geçme olasılığı)
+    """
+    rng = np.random.default_rng(seed)
+    props = rule_properties(rules)
+    cols = store.columns(props)
+    compiled = compile_rules(rules, {prop: k for k, prop in enumerate(props)})
+    criteria = [rule["criterion"] for rule in rules]
+
+    mins, maxs = store.ranges(rows, cols)
+    n = len(mins)
+    prob = np.zeros((n, len(compiled)))
+    prob_all = np.zeros(n)
+
+    chunk = max(1, max_cells // max(1, n_samples * len(props)))
+    for start in range(0, n, chunk):
+        # Eleme için float32 hassasiyeti yeterli; bellek ve süre yarıya iner
+        lo = mins[start:start + chunk, None, :].astype(np.float32)
+        span = maxs[start:start + chunk, None, :].astype(np.float32) - lo
+        rows_in_chunk = lo.shape[0]
+        # (satır, örnek, özellik) → kurallar 2B matris bekler: (satır·örnek, özellik)
+        samples = rng.random((rows_in_chunk, n_samples, len(props)), dtype=np.float32)
+        samples *= span
+        samples += lo
+        samples = samples.reshape(rows_in_chunk * n_samples, len(props))
+
+        passed_all = np.ones(rows_in_chunk * n_samples, dtype=bool)
+        for k, mask in enumerate(compiled):
+            passed = mask(samples)
+            prob[start:start + chunk, k] = passed.reshape(rows_in_chunk, n_samples).mean(axis=1)
+            passed_all &= passed
+        prob_all[start:start + chunk] = passed_all.reshape(rows_in_chunk, n_samples).mean(axis=1)
+
+    return criteria, prob, prob_all
+
+
+def describe_rule(rule):
+    if rule["type"] == "band":
+        return (f"The **{rule['criterion']} of the composite** must be compatible with the "
+                f"**{rule['criterion']} of {rule['reference']} ({rule['center']:g})** with a "
+                f"**maximum variation of {rule['tolerance'] * 100:g}%**.")
+    if rule["type"] == "cost_ceiling":
+        return (f"The **cost of the composite** must be **at least {(1 - rule['max_fraction']) * 100:g}% lower than "
+                f"the cost of {rule['reference']}** in terms of **euro/m³**.")
+    if rule["type"] == "hdt_gate":
+        return (f"The **composite must not undergo plastic deformation** under "
+                f"**autoclave conditions ({rule['min_required']:g}°C and {rule['pressure'] * 10:g} bar)**.")
+    return rule["criterion"]
@@ -0,0 +1,236 @@
+# scoring.py
+import numpy as np
+
+# Filtre koşulu → kod (bilinmeyen koşul: -1)
+CONDITION_CODES = {
+    "smaller than": 0,
+    "larger than": 1,
+    "equal to": 2
+}
+
+EXACT_MATCH_BONUS = 1.05
+# Ağırlık duyarlılığı sınırları: tablo satırı, ısı haritası / sıra değişimi aday sayısı,
+# parça başına (aday × örnek) hücre
+STABILITY_MAX_ROWS = 200
+STABILITY_MAX_PAIRS = 50
+STABILITY_CHUNK_CELLS = 4_000_000
+
+
+def condition_codes(conditions):
+    return np.array([CONDITION_CODES.get(c, -1) for c in conditions], dtype=np.int8)
+
+
+# ---------------------------
+# 🔢 Toplu skor çekirdeği
+# ---------------------------
+def score_matrix(mins, maxs, codes, user_vals):
+    """
+    Parçalı skor kurallarını (aday × özellik) matrisinde tek çağrıda uygular.
+    - mins / maxs: (n, k) aralık sınırları (eksik → NaN → skor 0.0)
+    - codes: (k,) koşul kodları, user_vals: (k,) kullanıcı değerleri
+    Tek değerli aralıklarda ve merkeze tam eşleşmede 1.05 bonus korunur.
+    """
+    # Kolon bazlı (özellik × aday) bitişik float32 düzen: her özellik tek bir 1B vektör;
+    # ara sonuçlar tek bir tampon ve çıktı satırı üzerinde yerinde hesaplanır
+    mins_t = np.ascontiguousarray(np.asarray(mins, dtype=np.float32).T)
+    maxs_t = np.ascontiguousarray(np.asarray(maxs, dtype=np.float32).T)
+    codes = np.asarray(codes)
+    user = np.asarray(user_vals, dtype=np.float32)
+    scores_t = np.zeros(mins_t.shape, dtype=np.float32)
+    range_val = np.empty(mins_t.shape[1], dtype=np.float32)
+    x = np.empty_like(range_val)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for j in range(len(codes)):
+            lo, hi, u, out = mins_t[j], maxs_t[j], user[j], scores_t[j]
+            np.subtract(hi, lo, out=range_val)
+            if codes[j] in (0, 1):
+                # x: kullanıcı değerinin "iyi" uçtan aralık boyu cinsinden uzaklığı
+                if codes[j] == 0:
+                    np.subtract(u, lo, out=x)
+                else:
+                    np.subtract(hi, u, out=x)
+                x /= range_val
+                # x ≤ 0 → 1.0 | 0 < x ≤ 1 → 1 - x | x > 1 (aralık dışı) → max(0, 1 - (x - 1))
+                np.subtract(1, x, out=out)
+                out += x > 1
+                np.clip(out, 0, 1, out=out)
+            elif codes[j] == 2:
+                np.add(lo, hi, out=x)
+                x *= 0.5
+                np.subtract(u, x, out=x)
+                np.abs(x, out=x)
+                exact = x == 0
+                x /= range_val
+                np.subtract(1, x, out=out)
+                np.maximum(out, 0, out=out)
+                out[exact] = EXACT_MATCH_BONUS
+
+            # min == max: tam eşleşme bonusu, aksi halde göreli uzaklık (koşuldan bağımsız)
+            degenerate = np.flatnonzero(range_val == 0)
+            if len(degenerate):
+                d_min = lo[degenerate]
+                scale = np.where(d_min != 0, np.abs(d_min), 1.0)
+                out[degenerate] = np.where(
+                    d_min == u,
+                    EXACT_MATCH_BONUS,
+                    np.maximum(0.0, 1 - np.abs(u - d_min) / scale)
+                )
+
+            # Eksik veri → 0.0
+            out[np.isnan(range_val)] = 0.0
+
+    return scores_t.T
+
+
+def weighted_scores(scores, weights):
+    """
+    Ağırlıklar 0–100 ölçeğinde. Toplam skor (/100) tek bir matris-vektör çarpımıdır;
+    ağırlık değişince skor matrisi yeniden hesaplanmaz. Çarpım skor matrisinin türünde
+    (float32) yapılır, yalnızca (n,) sonuç float64'e çevrilir.
+    """
+    return (scores @ np.asarray(weights, dtype=scores.dtype)).astype(float)
+
+
+def score_contributions(scores, weights, rows):
+    """
+    Yalnızca gösterilen satırlar için özellik başına katkılar (/100).
+    """
+    return scores[rows] * np.asarray(weights, dtype=float)
+
+
+# ---------------------------
+# 🗂️ Çok senaryolu toplu değerlendirme
+# ---------------------------
+def scenario_scores(mins, maxs, codes, values, weights):
+    """
+    Senaryo × aday × özellik tensörü tek geçişte: kullanılan her (senaryo, özellik) çifti
+    bir kolon olur ve hepsi tek score_matrix çağrısıyla skorlanır; senaryolara toplama ve
+    filtre kontrolü (senaryo üyelik matrisiyle) birer matris çarpımıdır.
+    - mins / maxs: (n, p) ortak özellik kümesi
+    - codes / values / weights: (s, p); senaryoda kullanılmayan özelliğin kodu -1
+    Filtre anlamı Tab 3 ile aynıdır (smaller: min ≤ değer, larger: max ≥ değer,
+    equal: min ≤ değer ≤ max, eksik veri geçmez).
+    Geri dönüş: (toplam skorlar (s, n) /100, filtreleri geçen adaylar (s, n) bool)
+    """
+    mins = np.asarray(mins, dtype=float)
+    maxs = np.asarray(maxs, dtype=float)
+    codes = np.asarray(codes)
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+
+    scenario_idx, prop_idx = np.nonzero(codes >= 0)
+    lo, hi = mins[:, prop_idx], maxs[:, prop_idx]
+    pair_codes = codes[scenario_idx, prop_idx]
+    pair_values = values[scenario_idx, prop_idx]
+    scores = score_matrix(lo, hi, pair_codes, pair_values)
+
+    with np.errstate(invalid="ignore"):
+        passes = np.where(
+            pair_codes == 0, lo <= pair_values,
+            np.where(pair_codes == 1, hi >= pair_values, (lo <= pair_values) & (pair_values <= hi))
+        )
+
+    membership = np.zeros((len(prop_idx), len(codes)))
+    membership[np.arange(len(prop_idx)), scenario_idx] = 1.0
+    failures = (~passes).astype(float) @ membership
+    totals = (scores * weights[scenario_idx, prop_idx]) @ membership
+    return totals.T, (failures == 0).T
+
+
+# ---------------------------
+# 🏆 Kısmi seçimle ilk N sıralama
+# ---------------------------
+def top_k(values, k):
+    """
+    En yüksek k değerin indekslerini azalan sırada döndürür.
+    Yalnızca seçilen k eleman sıralanır; eşitlikte önceki indeks önce gelir (sorted() ile aynı).
+    """
+    values = np.asarray(values)
+    n = len(values)
+    k = max(0, min(int(k), n))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if k == n:
+        idx = np.arange(n)
+    else:
+        kth = np.partition(values, n - k)[n - k]
+        above = np.flatnonzero(values > kth)
+        ties = np.flatnonzero(values == kth)[:k - len(above)]
+        idx = np.concatenate([above, ties])
+    return idx[np.lexsort((idx, -values[idx]))]
+
+
+# ---------------------------
+# 🎲 Monte Carlo ağırlık duyarlılığı
+# ---------------------------
+def sample_weights(base_weights, n_samples, mode="dirichlet", concentration=50.0, seed=None):
+    """
+    Simpleks üzerinde ağırlık vektörleri örnekler (her satırın toplamı 100).
+    - "dirichlet": kullanıcı ağırlıkları etrafında, concentration büyüdükçe daha dar
+    - "uniform": simpleks üzerinde düzgün dağılım
+    """
+    rng = np.random.default_rng(seed)
+    base = np.asarray(base_weights, dtype=float)
+    if mode == "uniform":
+        alpha = np.ones(len(base))
+    else:
+        alpha = np.maximum(concentration * base / base.sum(), 1e-3)
+    return rng.dirichlet(alpha, size=n_samples) * 100
+
+
+def rank_stability(score_mat, weight_samples, base_weights, top=20, pairs=STABILITY_MAX_PAIRS):
+    """
+    Tüm örnekler için tüm adaylar matris çarpımıyla skorlanır. Örnekler, ara matrisler
+    STABILITY_CHUNK_CELLS hücreyi geçmeyecek parçalar halinde işlenir; tam sıra matrisi
+    tutulmaz, istatistikler parça parça biriktirilir (bellek aday sayısı ve örnek sayısıyla büyümez).
+    Geri dönüş (sıralar 0 tabanlı):
+    - base_order: kullanıcı ağırlıklarıyla sıralama
+    - rows: izlenen ilk `top` aday (en fazla STABILITY_MAX_ROWS)
+    - p_first / mean_rank: tüm adaylar için #1 olma olasılığı ve ortalama sıra
+    - rank_percentiles: rows için (5, 50, 95) sıra yüzdelikleri, (3, len(rows))
+    - rank_distribution: ilk `pairs` aday × sıra (son kolon: pairs ve sonrası) olasılıkları
+    - reversal: ilk `pairs` aday için P(i, j'nin gerisinde kalır) matrisi
+    """
+    score_mat = np.asarray(score_mat, dtype=float)
+    weight_samples = np.asarray(weight_samples, dtype=float)
+    n, n_samples = len(score_mat), len(weight_samples)
+
+    base_order = top_k(score_mat @ np.asarray(base_weights, dtype=float), n)
+    rows = base_order[:min(top, STABILITY_MAX_ROWS)]
+    k = min(len(rows), pairs)
+
+    first_counts = np.zeros(n, dtype=np.int64)
+    rank_sums = np.zeros(n, dtype=np.int64)
+    row_ranks = np.empty((len(rows), n_samples), dtype=np.int32)
+    distribution = np.zeros(k * (k + 1), dtype=np.int64)
+    reversal_counts = np.zeros((k, k), dtype=np.int64)
+
+    positions = np.arange(n, dtype=np.int32)[:, None]
+    # Parça boyu hem (aday × örnek) sıra matrisini hem (pairs × pairs × örnek) karşılaştırmayı sınırlar
+    chunk = max(1, STABILITY_CHUNK_CELLS // max(n, k * k, 1))
+    for start in range(0, n_samples, chunk):
+        totals = score_mat @ weight_samples[start:start + chunk].T
+        order = np.argsort(-totals, axis=0, kind="stable")
+        ranks = np.empty_like(order, dtype=np.int32)
+        np.put_along_axis(ranks, order, positions, axis=0)
+        del totals, order
+
+        first_counts += np.bincount(ranks.argmin(axis=0), minlength=n)
+        rank_sums += ranks.sum(axis=1)
+        row_ranks[:, start:start + chunk] = ranks[rows]
+        top_ranks = ranks[rows[:k]]
+        distribution += np.bincount(
+            (np.arange(k)[:, None] * (k + 1) + np.minimum(top_ranks, k)).ravel(), minlength=k * (k + 1)
+        )
+        reversal_counts += (top_ranks[:, None, :] > top_ranks[None, :, :]).sum(axis=2)
+
+    return {
+        "base_order": base_order,
+        "rows": rows,
+        "p_first": first_counts / n_samples,
+        "mean_rank": rank_sums / n_samples,
+        "rank_percentiles": np.percentile(row_ranks, [5, 50, 95], axis=1),
+        "rank_distribution": distribution.reshape(k, k + 1) / n_samples,
+        "reversal": reversal_counts / n_samples
+    }
@@ -0,0 +1,63 @@
+# similarity.py
+import numpy as np
+from scipy.spatial import cKDTree
+
+
+# ---------------------------
+# 🧭 Benzer kompozit araması (KD-ağacı)
+# ---------------------------
+class SimilarityIndex:
+    """
+    Her özellik iki öznitelikle temsil edilir: aralık orta noktası ve yarı genişliği.
+    İkisi de özelliğin orta nokta dağılımına göre ölçeklenir (medyan / çeyrekler arası açıklık),
+    böylece birimler karşılaştırılabilir olur. Eksik değerler nötr kabul edilir (medyan orta
+    nokta, medyan genişlik). Özellik ağırlıkları √w ile özniteliklere çarpılır; KD-ağacı
+    veri seti sürümü ve ağırlıklar değişmedikçe bir kez kurulur.
+    """
+
+    def __init__(self, store, props, weights=None):
+        self.version = store.version
+        self.props = list(props)
+        weights = np.ones(len(self.props)) if weights is None else np.asarray(weights, dtype=float)
+        self.scale_weights = np.sqrt(weights)
+
+        mins, maxs = store.ranges(None, store.columns(self.props))
+        mid = (mins + maxs) / 2
+        half = (maxs - mins) / 2
+        self.missing = np.isnan(mid)
+
+        center = np.nanmedian(mid, axis=0)
+        q75, q25 = np.nanpercentile(mid, [75, 25], axis=0)
+        scale = q75 - q25
+        fallback = np.nanstd(mid, axis=0)
+        scale = np.where(scale > 0, scale, np.where(fallback > 0, fallback, 1.0))
+        center = np.nan_to_num(center)
+
+        mid_z = (mid - center) / scale
+        half_z = half / scale
+        mid_z[self.missing] = 0.0
+        half_z = np.where(self.missing, np.nanmedian(half_z, axis=0), half_z)
+        half_z = np.nan_to_num(half_z)
+
+        # Öznitelik düzeni: [orta noktalar..., yarı genişlikler...]
+        self.features = np.hstack([mid_z, half_z]) * np.tile(self.scale_weights, 2)
+        self.tree = cKDTree(self.features)
+
+    def query(self, row, k=10):
+        """
+        row satırına en yakın k kompozit (kendisi hariç).
+        Geri dönüş: (satırlar, uzaklıklar, özellik başına uzaklık² payları (k × özellik))
+        """
+        k = min(k, len(self.features) - 1)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0), np.empty((0, len(self.props)))
+        distances, rows = self.tree.query(self.features[row], k=k + 1)
+        keep = rows != row
+        rows, distances = rows[keep][:k], distances[keep][:k]
+
+        diff = (self.features[rows] - self.features[row]) ** 2
+        n_props = len(self.props)
+        per_prop = diff[:, :n_props] + diff[:, n_props:]
+        total = per_prop.sum(axis=1, keepdims=True)
+        shares = np.divide(per_prop, total, out=np.zeros_like(per_prop), where=total > 0)
+        return rows, distances, shares
@@ -0,0 +1,144 @@
+# tests/test_material_import.py
+import io
+import os
+import sys
+import zipfile
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import material_import
+from material_import import import_excel
+
+PROPERTIES = ["Cost (USD/kg)", "Density (kg/m³)"]
+HEADER = ["Name"] + [f"{prop} {bound}" for prop in PROPERTIES for bound in ("min", "max")]
+ROWS = [["PEEK", 50, 80, 1300, 1320], ["PPS 40% GF", 8, 12, 1650, 1670]]
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    '</Types>'
+)
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Template" sheetId="1" r:id="rId1"/></sheets></workbook>'
+)
+WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>'
+    '</Relationships>'
+)
+MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _workbook(rows, style="plain"):
+    """
+    Elle yazılmış XLSX: metinler paylaşılan dizgi. style:
+    - "plain": <c r="A1" t="s"> (hızlı yolun varsaydığı düzen)
+    - "reordered": <c t="s" r="A1">
+    - "prefixed": <x:worksheet xmlns:x=...><x:c r="A1" ...>
+    - "no_ref": hücre ve satırlarda r yok
+    """
+    strings = []
+    prefix = "x:" if style == "prefixed" else ""
+    sheet_rows = []
+    for r, row in enumerate(rows, 1):
+        cells = []
+        for c, value in enumerate(row):
+            ref = f"{chr(65 + c)}{r}"
+            if isinstance(value, str):
+                strings.append(value)
+                attrs = {"plain": f'r="{ref}" t="s"', "reordered": f't="s" r="{ref}"',
+                         "prefixed": f'r="{ref}" t="s"', "no_ref": 't="s"'}[style]
+                cells.append(f"<{prefix}c {attrs}><{prefix}v>{len(strings) - 1}</{prefix}v></{prefix}c>")
+            else:
+                attrs = "" if style == "no_ref" else f' r="{ref}"'
+                cells.append(f"<{prefix}c{attrs}><{prefix}v>{value}</{prefix}v></{prefix}c>")
+        row_attrs = "" if style == "no_ref" else f' r="{r}"'
+        sheet_rows.append(f"<{prefix}row{row_attrs}>{''.join(cells)}</{prefix}row>")
+    namespace = f'xmlns:x="{MAIN}"' if style == "prefixed" else f'xmlns="{MAIN}"'
+    sheet = (
+        f'<?xml version="1.0" encoding="UTF-8"?><{prefix}worksheet {namespace}>'
+        f"<{prefix}sheetData>{''.join(sheet_rows)}</{prefix}sheetData></{prefix}worksheet>"
+    )
+    shared = (
+        f'<?xml version="1.0" encoding="UTF-8"?><sst xmlns="{MAIN}" count="{len(strings)}" uniqueCount="{len(strings)}">'
+        + "".join(f"<si><t>{text}</t></si>" for text in strings) + "</sst>"
+    )
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w") as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", ROOT_RELS)
+        archive.writestr("xl/workbook.xml", WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        archive.writestr("xl/worksheets/sheet1.xml", sheet)
+        archive.writestr("xl/sharedStrings.xml", shared)
+    output.seek(0)
+    return output
+
+
+def _expected():
+    values = np.array([row[1:] for row in ROWS], dtype=float)
+    return values[:, 0::2], values[:, 1::2]
+
+
+@pytest.mark.parametrize("style", ["plain", "reordered", "prefixed", "no_ref"])
+def test_cell_layouts(style):
+    names, mins, maxs, errors = import_excel(_workbook([HEADER] + ROWS, style), PROPERTIES)
+    expected_mins, expected_maxs = _expected()
+    assert names == [row[0] for row in ROWS]
+    assert np.array_equal(mins, expected_mins)
+    assert np.array_equal(maxs, expected_maxs)
+    assert errors == []
+
+
+def test_plain_layout_uses_fast_path(monkeypatch):
+    def fail(*args):
+        raise AssertionError("openpyxl fallback used")
+    monkeypatch.setattr(material_import, "_openpyxl_cell_chunks", fail)
+    names, _, _, errors = import_excel(_workbook([HEADER] + ROWS), PROPERTIES)
+    assert names == [row[0] for row in ROWS] and errors == []
+
+
+def test_late_chunk_mismatch_falls_back(monkeypatch):
+    # Küçük parçalar: uyumsuz hücre ilk parçadan sonra gelir
+    monkeypatch.setattr(material_import, "XML_CHUNK_BYTES", 256)
+    rows = [HEADER] + [[f"M{i}", 1, 2, 3, 4] for i in range(50)]
+    workbook = _workbook(rows)
+    with zipfile.ZipFile(workbook) as archive:
+        parts = {name: archive.read(name) for name in archive.namelist()}
+    sheet = parts["xl/worksheets/sheet1.xml"]
+    parts["xl/worksheets/sheet1.xml"] = sheet.replace(b'<c r="B50">', b'<c s="0" r="B50">')
+    patched = io.BytesIO()
+    with zipfile.ZipFile(patched, "w") as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+    patched.seek(0)
+
+    names, mins, maxs, errors = import_excel(patched, PROPERTIES)
+    assert len(names) == 50 and errors == []
+    assert np.all(mins[:, 0] == 1) and np.all(maxs[:, 1] == 4)
+
+
+def test_ambiguous_comma_is_reported():
+    rows = [HEADER, ["PEEK", "1,000", 80, 1300, 1320]]
+    names, mins, _, errors = import_excel(_workbook(rows), PROPERTIES)
+    assert names == ["PEEK"] and np.isnan(mins[0, 0])
+    assert errors == [{"Row": 2, "Column": "Cost (USD/kg) min", "Value": "1,000", "Error": "Non-numeric value"}]